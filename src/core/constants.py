@@ -83,6 +83,7 @@ class ExcelFontSizes:
 
 MAX_COLUMN_WIDTH = 50  # Maximum column width in characters
 DEFAULT_COLUMN_PADDING = 2  # Extra padding for column width
+DEFAULT_ZIP_COMPRESSION_LEVEL = 1  # zlib level for .xlsx archives (1 = fastest, 9 = smallest)
 
 # ============================================================================
 # OUTPUT CONFIGURATION
@@ -91,6 +92,7 @@ DEFAULT_COLUMN_PADDING = 2  # Extra padding for column width
 DEFAULT_OUTPUT_FOLDER = 'output'
 EXCEL_FILE_PREFIX = 'complete_'
 EXCEL_FILE_EXTENSION = '.xlsx'
+OUTPUT_FILE_BUFFER_SIZE = 1024 * 1024  # Write buffer for .xlsx output files (bytes)
 
 # Sheet names
 SHEET_COMPLETE_FLOW = 'Complete_Flow'
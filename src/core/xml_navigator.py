@@ -2,12 +2,17 @@
 Utilities for navigating the L5X file XML tree.
 Provides common search and element access functions.
 """
+import weakref
 import xml.etree.ElementTree as ET
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional
 from .logger import get_logger
 
 logger = get_logger(__name__)
 
+# Program element -> {DataType: [Tag elements]}, built once per program.
+# Weak keys so the index is dropped together with its parsed tree
+_TAGS_BY_DATA_TYPE_CACHE = weakref.WeakKeyDictionary()
+
 
 class XMLNavigator:
     """
@@ -78,8 +83,7 @@ class XMLNavigator:
         Returns:
             Routine element or None if not found
         """
-        routines = self.root.findall(f'{self.ROUTINES_PATH}[@Name="{routine_name}"]')
-        return routines[0] if routines else None
+        return self.root.find(f'{self.ROUTINES_PATH}[@Name="{routine_name}"]')
     
     def find_routines_by_pattern(self, pattern: str) -> List[ET.Element]:
         """
@@ -145,7 +149,52 @@ class XMLNavigator:
             List of Rung elements
         """
         return routine.findall('.//Rung')
+
+    @staticmethod
+    def iter_rung_texts(routine: ET.Element) -> Iterator[str]:
+        """
+        Yield the logic text of each rung in a Ladder (RLL) routine.
+
+        Equivalent to get_routine_rungs() + rung.find('.//Text') per rung, but
+        walks the tree with Element.iter() instead of evaluating a path per rung.
+        Rungs without text are skipped.
+
+        Args:
+            routine: Routine element
+
+        Yields:
+            Text content of each rung's first Text element
+        """
+        for rung in routine.iter('Rung'):
+            for text_element in rung.iter('Text'):
+                if text_element.text:
+                    yield text_element.text
+                break
     
+    @staticmethod
+    def get_tags_by_data_type(program: ET.Element) -> Dict[str, List[ET.Element]]:
+        """
+        Index a program's tags by DataType in a single pass.
+
+        Buckets the same elements as program.findall('.//Tags/Tag') (in document
+        order) by their DataType attribute. The index is built on first use and
+        shared by every extractor that looks up tags of this program.
+
+        Args:
+            program: Program element
+
+        Returns:
+            Dictionary mapping DataType -> list of Tag elements
+        """
+        index = _TAGS_BY_DATA_TYPE_CACHE.get(program)
+        if index is None:
+            index = {}
+            for tags_elem in program.iter('Tags'):
+                for tag in tags_elem.iterfind('Tag'):
+                    index.setdefault(tag.get('DataType'), []).append(tag)
+            _TAGS_BY_DATA_TYPE_CACHE[program] = index
+        return index
+
     def find_tag_by_name(self, tag_name: str) -> Optional[ET.Element]:
         """
         Search for a specific tag by name.
@@ -156,8 +205,7 @@ class XMLNavigator:
         Returns:
             Tag element or None if not found
         """
-        tags = self.root.findall(f'{self.TAGS_PATH}[@Name="{tag_name}"]')
-        return tags[0] if tags else None
+        return self.root.find(f'{self.TAGS_PATH}[@Name="{tag_name}"]')
     
     def get_tag_dimension(self, tag_name: str) -> Optional[int]:
         """
@@ -297,8 +345,7 @@ class XMLNavigator:
         Returns:
             Program element or None if not found
         """
-        programs = self.root.findall(f'.//Controller/Programs/Program[@Name="{program_name}"]')
-        return programs[0] if programs else None
+        return self.root.find(f'.//Controller/Programs/Program[@Name="{program_name}"]')
 
     def find_routines_in_program(self, program_name: str, prefix: str = None) -> List[ET.Element]:
         """
@@ -2,10 +2,19 @@
 Excel exporter for sequences and transitions data.
 Uses openpyxl to create .xlsx files with multiple sheets.
 """
+import datetime
+import re
+from zipfile import ZipFile, ZIP_DEFLATED
 from openpyxl import Workbook
+from openpyxl.cell import Cell
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
 from typing import Dict, Any, List
-from ..core.constants import ExcelColors, ExcelFontSizes, MAX_COLUMN_WIDTH, DEFAULT_COLUMN_PADDING
+from ..core.constants import ExcelColors, ExcelFontSizes, MAX_COLUMN_WIDTH, DEFAULT_COLUMN_PADDING, DEFAULT_ZIP_COMPRESSION_LEVEL, OUTPUT_FILE_BUFFER_SIZE
+
+# Controls manifold name inside a manifold tag: '_010UA1KJ1_KEB1_Hw' -> 'KJ1'
+_KJ_RE = re.compile(r'KJ(\d{1,2})')
 
 
 class ExcelExporter:
@@ -14,26 +23,46 @@ class ExcelExporter:
     One file per routine with separate sheets for sequences and transitions.
     """
     
-    def __init__(self):
-        """Initialize the Excel exporter."""
-        # Header styles
-        self.header_fill = PatternFill(start_color=ExcelColors.HEADER_FILL, end_color=ExcelColors.HEADER_FILL, fill_type="solid")
-        self.header_font = Font(bold=True, color=ExcelColors.HEADER_FONT)
-        self.header_alignment = Alignment(horizontal="center", vertical="center")
-
-        # Styles for Complete_Flow sheet
-        self.transition_fill = PatternFill(start_color=ExcelColors.TRANSITION_FILL, end_color=ExcelColors.TRANSITION_FILL, fill_type="solid")
-        self.transition_font = Font(bold=True, color=ExcelColors.TRANSITION_FONT, size=ExcelFontSizes.TRANSITION)
-        self.sequence_fill = PatternFill(start_color=ExcelColors.SEQUENCE_FILL, end_color=ExcelColors.SEQUENCE_FILL, fill_type="solid")
-        self.sequence_font = Font(bold=True, color=ExcelColors.SEQUENCE_FONT, size=ExcelFontSizes.SEQUENCE)
-        self.step_fill = PatternFill(start_color=ExcelColors.STEP_FILL, end_color=ExcelColors.STEP_FILL, fill_type="solid")
-        self.step_font = Font(bold=True, color=ExcelColors.STEP_FONT, size=ExcelFontSizes.STEP)
-        self.action_fill = PatternFill(start_color=ExcelColors.ACTION_FILL, end_color=ExcelColors.ACTION_FILL, fill_type="solid")
-        self.action_font = Font(bold=True, color=ExcelColors.ACTION_FONT, size=ExcelFontSizes.ACTION)
-
-        # Data cell styles - dark theme for eye comfort
-        self.data_fill = PatternFill(start_color=ExcelColors.DATA_FILL, end_color=ExcelColors.DATA_FILL, fill_type="solid")
-        self.data_font = Font(color=ExcelColors.DATA_FONT)
+    # Style objects are immutable, so they are built once and shared by all instances
+
+    # Header styles
+    header_fill = PatternFill(start_color=ExcelColors.HEADER_FILL, end_color=ExcelColors.HEADER_FILL, fill_type="solid")
+    header_font = Font(bold=True, color=ExcelColors.HEADER_FONT)
+    header_alignment = Alignment(horizontal="center", vertical="center")
+
+    # Styles for Complete_Flow sheet
+    transition_fill = PatternFill(start_color=ExcelColors.TRANSITION_FILL, end_color=ExcelColors.TRANSITION_FILL, fill_type="solid")
+    transition_font = Font(bold=True, color=ExcelColors.TRANSITION_FONT, size=ExcelFontSizes.TRANSITION)
+    sequence_fill = PatternFill(start_color=ExcelColors.SEQUENCE_FILL, end_color=ExcelColors.SEQUENCE_FILL, fill_type="solid")
+    sequence_font = Font(bold=True, color=ExcelColors.SEQUENCE_FONT, size=ExcelFontSizes.SEQUENCE)
+    step_fill = PatternFill(start_color=ExcelColors.STEP_FILL, end_color=ExcelColors.STEP_FILL, fill_type="solid")
+    step_font = Font(bold=True, color=ExcelColors.STEP_FONT, size=ExcelFontSizes.STEP)
+    action_fill = PatternFill(start_color=ExcelColors.ACTION_FILL, end_color=ExcelColors.ACTION_FILL, fill_type="solid")
+    action_font = Font(bold=True, color=ExcelColors.ACTION_FONT, size=ExcelFontSizes.ACTION)
+
+    # Data cell styles - dark theme for eye comfort
+    data_fill = PatternFill(start_color=ExcelColors.DATA_FILL, end_color=ExcelColors.DATA_FILL, fill_type="solid")
+    data_font = Font(color=ExcelColors.DATA_FONT)
+
+    # Duplicate description highlight (shared by every duplicate row)
+    duplicate_fill = PatternFill(start_color=ExcelColors.DUPLICATE_FILL, end_color=ExcelColors.DUPLICATE_FILL, fill_type='solid')
+    duplicate_font = Font(color=ExcelColors.DUPLICATE_FONT)
+
+    def __init__(self, compression_level: int = DEFAULT_ZIP_COMPRESSION_LEVEL):
+        """
+        Initialize the Excel exporter.
+
+        Args:
+            compression_level: zlib level (0-9) used for the .xlsx zip archive.
+                Low levels save much faster at the cost of slightly larger files.
+        """
+        self.compression_level = compression_level
+
+        # Interned style arrays keyed by (fill, font, alignment); reset per workbook
+        self._style_cache = {}
+
+        # Widest value per column of the sheet being built; reset after each sheet
+        self._column_max_lengths = []
 
     def _extract_kj_name(self, manifold: str) -> str:
         """
@@ -45,11 +74,10 @@ class ExcelExporter:
         Returns:
             KJ name (e.g., 'KJ1') or 'N/A' if not found
         """
-        import re
         if not manifold:
             return 'N/A'
 
-        match = re.search(r'KJ(\d{1,2})', manifold)
+        match = _KJ_RE.search(manifold)
         return f"KJ{match.group(1)}" if match else 'N/A'
 
     def _build_valve_diagram_name(self, kj_name: str, valve_work: str) -> str:
@@ -85,11 +113,12 @@ class ExcelExporter:
             valve_mappings_data: Dictionary with valve mapping data
             output_path: Path for the output Excel file
         """
+        # The default sheet is reused as Complete_Flow, so nothing needs removing
         wb = Workbook()
 
-        # Remove default sheet
-        if 'Sheet' in wb.sheetnames:
-            wb.remove(wb['Sheet'])
+        # Interned style arrays are per workbook
+        self._style_cache = {}
+        self._column_max_lengths = []
 
         # Create Complete_Flow sheet (new main view)
         self._create_complete_flow_sheet(wb, sequences_data, transitions_data)
@@ -107,8 +136,26 @@ class ExcelExporter:
 
         # Note: Actuator groups and valve mappings are now included in Sequences_Actuators sheet
 
-        # Save workbook
-        wb.save(output_path)
+        # Save workbook once, after all sheets are built (sheet builders never save)
+        self._save_workbook(wb, output_path)
+
+    def _save_workbook(self, wb: Workbook, output_path: str):
+        """
+        Save the workbook with the configured zip compression level.
+
+        Mirrors openpyxl's save_workbook() but opens the archive with an
+        explicit compresslevel instead of the zlib default (6), on a file
+        handle with a large write buffer to cut down on small writes.
+
+        Args:
+            wb: Workbook object
+            output_path: Path to the output .xlsx file
+        """
+        with open(output_path, 'wb', buffering=OUTPUT_FILE_BUFFER_SIZE) as fh, \
+                ZipFile(fh, 'w', ZIP_DEFLATED, allowZip64=True,
+                        compresslevel=self.compression_level) as archive:
+            wb.properties.modified = datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+            ExcelWriter(wb, archive).save()
     
     def _create_sequences_sheet(self, wb: Workbook, data: Dict[str, Any], actuator_groups_data: Dict[str, Any] = None, valve_mappings_data: Dict[str, Any] = None, transitions_data: Dict[str, Any] = None):
         """
@@ -129,17 +176,32 @@ class ExcelExporter:
             for group in actuator_groups_data['actuator_groups']:
                 mm_to_description[group['tag_name']] = group['description']
 
-        # Create valve mapping dictionary: {MM1: {manifold: '...', valve_work: '1A', valve_home: '1B'}, ...}
+        # Create valve mapping dictionary:
+        # {MM1: (manifold, valve_work, valve_home, controls_manifold_name, controls_valve_name), ...}
+        # Fields and the derived KJ / diagram names depend only on the MM, so they
+        # are resolved once per MM here instead of once per action below
         mm_to_valve = {}
         if valve_mappings_data and valve_mappings_data.get('valve_mappings'):
-            mm_to_valve = valve_mappings_data['valve_mappings']
+            for mm, info in valve_mappings_data['valve_mappings'].items():
+                manifold = info.get('manifold', '')
+                valve_work = info.get('valve_work', '')
+                valve_home = info.get('valve_home', '')
+
+                # MMs without a manifold skip both helpers
+                if manifold:
+                    controls_manifold_name = self._extract_kj_name(manifold)
+                    controls_valve_name = self._build_valve_diagram_name(controls_manifold_name, valve_work)
+                    # Add apostrophe prefix to prevent formula evaluation for values starting with =
+                    if controls_valve_name.startswith('='):
+                        controls_valve_name = f"'{controls_valve_name}"  # Apostrophe prefix forces text interpretation
+                else:
+                    controls_manifold_name = controls_valve_name = 'N/A'
+
+                mm_to_valve[mm] = (manifold, valve_work, valve_home, controls_manifold_name, controls_valve_name)
+        no_valve = ('', '', '', 'N/A', 'N/A')
 
         # Create transition mapping: {seq_idx: transition_data}
-        transition_map = {}
-        if transitions_data and transitions_data.get('transitions'):
-            for transition in transitions_data['transitions']:
-                trans_idx = transition['transition_index']
-                transition_map[trans_idx] = transition
+        transition_map = {t['transition_index']: t for t in (transitions_data or {}).get('transitions') or ()}
 
         # Headers
         headers = [
@@ -164,16 +226,17 @@ class ExcelExporter:
         ]
         
         # Write headers
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.fill = self.header_fill
-            cell.font = self.header_font
-            cell.alignment = self.header_alignment
+        self._append_header_row(ws, headers)
         
         # Write data
-        row_num = 2
         routine_name = data['routine_name']
-        
+
+        # Rows are appended as pre-styled cells; bind hot lookups to locals
+        append = ws.append
+        track_widths = self._track_column_widths
+        data_style = self._intern_style(ws, fill=self.data_fill, font=self.data_font)
+        duplicate_style = self._intern_style(ws, fill=self.duplicate_fill, font=self.duplicate_font)
+
         for sequence in data['sequences']:
             seq_idx = sequence['sequence_index']
             
@@ -181,6 +244,14 @@ class ExcelExporter:
                 step_idx = step['step_index']
                 
                 for action in step['actions']:
+                    # Unpack action fields once; reused for every actuator row
+                    action_index = action['action_index']
+                    action_name = action['action_name']
+                    mm_number = action['mm_number'] or ''
+                    actuator_count = action['actuator_count']
+                    actuators = action['actuators']
+                    state = action['state']
+
                     # Determine validation status
                     validation_status = 'N/A'
                     missing_indices = ''
@@ -197,71 +268,53 @@ class ExcelExporter:
                     
                     # Format state
                     state_formatted = ''
-                    if action['state']:
-                        state_formatted = f"TO {action['state'].upper()}"
+                    if state:
+                        state_formatted = f"TO {state.upper()}"
                     
                     # Get MM group description
-                    mm_number = action['mm_number'] or ''
                     mm_description = mm_to_description.get(mm_number, '') if mm_number else ''
 
-                    # Get valve mapping information
-                    manifold = ''
-                    valve_work = ''
-                    valve_home = ''
-                    if mm_number and mm_number in mm_to_valve:
-                        valve_info = mm_to_valve[mm_number]
-                        manifold = valve_info.get('manifold', '')
-                        valve_work = valve_info.get('valve_work', '')
-                        valve_home = valve_info.get('valve_home', '')
-
-                    # Extract controls manifold name and build valve diagram name
-                    controls_manifold_name = self._extract_kj_name(manifold)
-                    controls_valve_name = self._build_valve_diagram_name(controls_manifold_name, valve_work)
+                    # Get valve mapping information (controls names precomputed per MM)
+                    (manifold, valve_work, valve_home,
+                     controls_manifold_name, controls_valve_name) = mm_to_valve.get(mm_number, no_valve) if mm_number else no_valve
 
                     # Count duplicate descriptions in this MM group
                     description_counts = {}
-                    for act in action['actuators']:
+                    for act in actuators:
                         desc = act['description']
                         description_counts[desc] = description_counts.get(desc, 0) + 1
 
+                    # Row buffer shared by every row of this action; only the
+                    # Actuators (13) and Description_Validation (18) slots change per row
+                    row_buf = [
+                        routine_name,
+                        seq_idx,
+                        step_idx,
+                        action_index,
+                        action_name,
+                        mm_number,
+                        mm_description,
+                        manifold,
+                        valve_work,
+                        valve_home,
+                        state_formatted,
+                        actuator_count,
+                        '',
+                        validation_status,
+                        missing_indices,
+                        controls_manifold_name,
+                        controls_valve_name,
+                        'N/A'  # Description_Validation
+                    ]
+
                     # Write one row per actuator
-                    if not action['actuators']:
+                    if not actuators:
                         # No actuators, write one row
-                        row_data = [
-                            routine_name,
-                            seq_idx,
-                            step_idx,
-                            action['action_index'],
-                            action['action_name'],
-                            mm_number,
-                            mm_description,
-                            manifold,
-                            valve_work,
-                            valve_home,
-                            state_formatted,
-                            action['actuator_count'],
-                            '',
-                            validation_status,
-                            missing_indices,
-                            controls_manifold_name,
-                            controls_valve_name,
-                            'N/A'  # Description_Validation
-                        ]
-
-                        for col_num, value in enumerate(row_data, 1):
-                            # Special handling for Controls_Valve_Name column (column 17)
-                            # Add apostrophe prefix to prevent formula evaluation for values starting with =
-                            if col_num == 17 and value and value != 'N/A' and value.startswith('='):
-                                cell = ws.cell(row=row_num, column=col_num)
-                                cell.value = f"'{value}"  # Apostrophe prefix forces text interpretation
-                            else:
-                                cell = ws.cell(row=row_num, column=col_num, value=value)
-                            cell.fill = self.data_fill
-                            cell.font = self.data_font
-                        row_num += 1
+                        track_widths(row_buf)
+                        append([Cell(ws, value=value, style_array=data_style) for value in row_buf])
                     else:
                         # One row per actuator
-                        for actuator in action['actuators']:
+                        for actuator in actuators:
                             desc = actuator['description']
                             count = description_counts[desc]
 
@@ -273,48 +326,20 @@ class ExcelExporter:
                                 desc_validation = f'Duplicate (appears {count} times)'
                                 is_duplicate = True
 
-                            row_data = [
-                                routine_name,
-                                seq_idx,
-                                step_idx,
-                                action['action_index'],
-                                action['action_name'],
-                                mm_number,
-                                mm_description,
-                                manifold,
-                                valve_work,
-                                valve_home,
-                                state_formatted,
-                                action['actuator_count'],
-                                actuator['description'],
-                                validation_status,
-                                missing_indices,
-                                controls_manifold_name,
-                                controls_valve_name,
-                                desc_validation
-                            ]
-
-                            for col_num, value in enumerate(row_data, 1):
-                                # Special handling for Controls_Valve_Name column (column 17)
-                                # Add apostrophe prefix to prevent formula evaluation for values starting with =
-                                if col_num == 17 and value and value != 'N/A' and value.startswith('='):
-                                    cell = ws.cell(row=row_num, column=col_num)
-                                    cell.value = f"'{value}"  # Apostrophe prefix forces text interpretation
-                                else:
-                                    cell = ws.cell(row=row_num, column=col_num, value=value)
-                                # Apply red fill for duplicates, dark theme for normal
-                                if col_num == 18 and is_duplicate:  # Column 18 is Description_Validation
-                                    cell.fill = PatternFill(start_color=ExcelColors.DUPLICATE_FILL, end_color=ExcelColors.DUPLICATE_FILL, fill_type='solid')
-                                    cell.font = Font(color=ExcelColors.DUPLICATE_FONT)
-                                else:
-                                    cell.fill = self.data_fill
-                                    cell.font = self.data_font
-                            row_num += 1
+                            row_buf[12] = desc
+                            row_buf[17] = desc_validation
+                            track_widths(row_buf)
+
+                            row_cells = [Cell(ws, value=value, style_array=data_style) for value in row_buf]
+                            # Apply red fill for duplicates (column 18 is Description_Validation)
+                            if is_duplicate:
+                                row_cells[17] = Cell(ws, value=desc_validation, style_array=duplicate_style)
+                            append(row_cells)
 
             # After all actuator rows for this sequence, append Fixed State and Wait Conditions (transition data)
-            if seq_idx in transition_map:
-                transition = transition_map[seq_idx]
-                row_num = self._write_fixed_state_section(ws, row_num, seq_idx, transition)
+            transition = transition_map.get(seq_idx)
+            if transition is not None:
+                self._write_fixed_state_section(ws, seq_idx, transition)
 
         # Auto-adjust column widths first (for columns with data)
         self._adjust_column_widths(ws)
@@ -322,64 +347,47 @@ class ExcelExporter:
         # Then apply dark background and set minimum widths for empty columns
         self._apply_dark_background_to_entire_sheet(ws)
 
-    def _write_fixed_state_section(self, ws, row_num: int, seq_idx: int, transition: Dict[str, Any]) -> int:
+    def _write_fixed_state_section(self, ws, seq_idx: int, transition: Dict[str, Any]):
         """
         Write Fixed State header and Wait Conditions (transition permissions) after sequence actuators.
 
         Args:
             ws: Worksheet
-            row_num: Current row number
             seq_idx: Sequence index
             transition: Transition data
-
-        Returns:
-            Updated row number
         """
         # Get transition name (e.g., "HomePos_R2S", "FxtToWorkPos1")
         transition_name = transition.get('transition_name', f'State{seq_idx}')
 
         # Write Fixed State header row
-        # Use column 2 (Sequence) for "Fixed State" label, column 3 for the state name
-        fixed_state_cell = ws.cell(row=row_num, column=2, value='Fixed State')
-        fixed_state_cell.fill = self.transition_fill
-        fixed_state_cell.font = self.transition_font
-
-        state_name_cell = ws.cell(row=row_num, column=3, value=transition_name)
-        state_name_cell.fill = self.transition_fill
-        state_name_cell.font = self.transition_font
-
-        # Fill remaining cells in the row with transition style
-        for col in range(1, 19):  # Columns 1-18
-            if col not in [2, 3]:  # Skip columns already filled
-                cell = ws.cell(row=row_num, column=col)
-                cell.fill = self.transition_fill
-
-        row_num += 1
-
-        # Write Wait Condition rows (permissions)
+        # Use column 2 (Sequence) for "Fixed State" label, column 3 for the state name;
+        # the remaining cells of columns 1-18 only get the transition fill
+        label_style = self._intern_style(ws, fill=self.transition_fill, font=self.transition_font)
+        fill_style = self._intern_style(ws, fill=self.transition_fill)
+        row_cells = [Cell(ws, style_array=fill_style) for _ in range(18)]
+        row_cells[1] = Cell(ws, value='Fixed State', style_array=label_style)
+        row_cells[2] = Cell(ws, value=transition_name, style_array=label_style)
+        self._track_column_widths((None, 'Fixed State', transition_name) + (None,) * 15)
+        ws.append(row_cells)
+
+        # Write Wait Condition rows (permissions), dark theme across columns 1-18
+        # Column 2: Wait Condition label
+        # Column 3: Permission index
+        # Column 4: Permission value
+        # Column 5: Comment
+        data_style = self._intern_style(ws, fill=self.data_fill, font=self.data_font)
+        trailing_blanks = (None,) * 13
         for permission in transition['permissions']:
-            # Column 2: Wait Condition label
-            # Column 3: Permission index
-            # Column 4: Permission value
-            # Column 5: Comment
-
-            ws.cell(row=row_num, column=2, value='Wait Condition')
-            ws.cell(row=row_num, column=3, value=permission['permission_index'])
-            ws.cell(row=row_num, column=4, value=permission['permission_value'])
-            ws.cell(row=row_num, column=5, value=permission['comment'])
-
-            # Apply dark theme to wait condition rows
-            for col in range(1, 19):
-                cell = ws.cell(row=row_num, column=col)
-                cell.fill = self.data_fill
-                cell.font = self.data_font
-
-            row_num += 1
+            self._append_styled_row(ws, (
+                None,
+                'Wait Condition',
+                permission['permission_index'],
+                permission['permission_value'],
+                permission['comment'],
+            ) + trailing_blanks, data_style)
 
         # Add blank row for separation before next sequence
-        row_num += 1
-
-        return row_num
+        ws.append(())
 
     def _create_digital_inputs_sheet(self, wb: Workbook, data: Dict[str, Any]):
         """
@@ -401,15 +409,13 @@ class ExcelExporter:
         ]
         
         # Write headers
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.fill = self.header_fill
-            cell.font = self.header_font
-            cell.alignment = self.header_alignment
-        
-        # Write data
-        row_num = 2
+        self._append_header_row(ws, headers)
         
+        # Write data: one pre-styled row append per input
+        append = ws.append
+        track_widths = self._track_column_widths
+        data_style = self._intern_style(ws, fill=self.data_fill, font=self.data_font)
+
         for digital_input in data['digital_inputs']:
             row_data = [
                 digital_input['program'],
@@ -418,12 +424,8 @@ class ExcelExporter:
                 digital_input['parent_name'],
                 digital_input.get('part_assignment', 'N/A')
             ]
-            
-            for col_num, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.fill = self.data_fill
-                cell.font = self.data_font
-            row_num += 1
+            track_widths(row_data)
+            append([Cell(ws, value=value, style_array=data_style) for value in row_data])
 
         # Auto-adjust column widths first (for columns with data)
         self._adjust_column_widths(ws)
@@ -452,16 +454,14 @@ class ExcelExporter:
         ]
         
         # Write headers
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.fill = self.header_fill
-            cell.font = self.header_font
-            cell.alignment = self.header_alignment
+        self._append_header_row(ws, headers)
         
-        # Write data
-        row_num = 2
+        # Write data: one pre-styled row append per permission
         routine_name = data['routine_name']
-        
+        append = ws.append
+        track_widths = self._track_column_widths
+        data_style = self._intern_style(ws, fill=self.data_fill, font=self.data_font)
+
         for transition in data['transitions']:
             trans_idx = transition['transition_index']
             permission_count = transition['permission_count']
@@ -475,12 +475,8 @@ class ExcelExporter:
                     permission['permission_value'],
                     permission['comment']
                 ]
-                
-                for col_num, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_num, column=col_num, value=value)
-                    cell.fill = self.data_fill
-                    cell.font = self.data_font
-                row_num += 1
+                track_widths(row_data)
+                append([Cell(ws, value=value, style_array=data_style) for value in row_data])
 
         # Auto-adjust column widths first (for columns with data)
         self._adjust_column_widths(ws)
@@ -488,69 +484,133 @@ class ExcelExporter:
         # Then apply dark background and set minimum widths for empty columns
         self._apply_dark_background_to_entire_sheet(ws)
     
+    def _intern_style(self, ws, fill: PatternFill = None, font: Font = None, alignment: Alignment = None):
+        """
+        Register a style combination with the workbook once and return its style array.
+
+        Cells built with this style array share the registered styles, so rows
+        can be appended in one call without per-cell style assignment.
+
+        Args:
+            ws: Worksheet the cells will belong to
+            fill: Optional fill style
+            font: Optional font style
+            alignment: Optional alignment style
+
+        Returns:
+            StyleArray to pass as style_array when building cells
+        """
+        key = (fill, font, alignment)
+        style = self._style_cache.get(key)
+        if style is None:
+            cell = Cell(ws)
+            if fill is not None:
+                cell.fill = fill
+            if font is not None:
+                cell.font = font
+            if alignment is not None:
+                cell.alignment = alignment
+            style = self._style_cache[key] = cell._style
+        return style
+
+    def _append_styled_row(self, ws, values, style):
+        """
+        Append one row whose cells all share the given style array.
+
+        Args:
+            ws: Worksheet object
+            values: Cell values for the row
+            style: StyleArray from _intern_style()
+        """
+        self._track_column_widths(values)
+        ws.append([Cell(ws, value=value, style_array=style) for value in values])
+
+    def _track_column_widths(self, values):
+        """
+        Record the widest value seen in each column of the sheet being built.
+
+        Empty values (None, '', 0) are skipped; cell values are str or numbers,
+        so str() needs no exception guard.
+
+        Args:
+            values: Cell values of one row, starting at column A
+        """
+        max_lengths = self._column_max_lengths
+        if len(values) > len(max_lengths):
+            max_lengths.extend([0] * (len(values) - len(max_lengths)))
+
+        for col_idx, value in enumerate(values):
+            if value:
+                length = len(value) if value.__class__ is str else len(str(value))
+                if length > max_lengths[col_idx]:
+                    max_lengths[col_idx] = length
+
+    def _append_header_row(self, ws, headers: List[str]):
+        """
+        Append the header row with the header fill, font and alignment.
+
+        Args:
+            ws: Worksheet object
+            headers: Column header labels
+        """
+        style = self._intern_style(ws, self.header_fill, self.header_font, alignment=self.header_alignment)
+        self._append_styled_row(ws, headers, style)
+
     def _adjust_column_widths(self, ws):
         """
         Auto-adjust column widths based on content.
-        
+
+        Uses the per-column maxima recorded by _track_column_widths() while the
+        rows were appended, so the sheet is not scanned again, then resets them
+        for the next sheet.
+
         Args:
             ws: Worksheet object
         """
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
-            
+        max_lengths = self._column_max_lengths
+        self._column_max_lengths = []
+
+        for col_idx, max_length in enumerate(max_lengths, 1):
             adjusted_width = min(max_length + DEFAULT_COLUMN_PADDING, MAX_COLUMN_WIDTH)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
     
     def _create_complete_flow_sheet(self, wb: Workbook, sequences_data: Dict[str, Any], transitions_data: Dict[str, Any]):
         """
         Create the Complete_Flow sheet showing the hierarchical flow.
+
+        Reuses the workbook's default (first) sheet, so it must run before
+        any other sheet is created.
         
         Args:
             wb: Workbook object
             sequences_data: Sequences data
             transitions_data: Transitions data
         """
-        ws = wb.create_sheet("Complete_Flow", 0)  # Insert as first sheet
+        ws = wb.active  # Default sheet is already the first sheet
+        ws.title = "Complete_Flow"
         
         # Headers
         headers = ['Type', 'Index', 'Description', 'Details', 'State/Comment']
         
         # Write headers
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.fill = self.header_fill
-            cell.font = self.header_font
-            cell.alignment = self.header_alignment
+        self._append_header_row(ws, headers)
         
-        row_num = 2
         routine_name = sequences_data['routine_name']
         
         # Build a mapping of sequence index to transition (if they match)
-        transition_map = {}
-        if transitions_data and transitions_data.get('transitions'):
-            for transition in transitions_data['transitions']:
-                trans_idx = transition['transition_index']
-                transition_map[trans_idx] = transition
-        
+        transition_map = {t['transition_index']: t for t in (transitions_data or {}).get('transitions') or ()}
+
         # Process each sequence and its corresponding transition
         for sequence in sequences_data['sequences']:
             seq_idx = sequence['sequence_index']
-            
+
             # Write Transition header if exists
-            if seq_idx in transition_map:
-                transition = transition_map[seq_idx]
-                row_num = self._write_transition_section(ws, row_num, transition)
+            transition = transition_map.get(seq_idx)
+            if transition is not None:
+                self._write_transition_section(ws, transition)
             
             # Write Sequence header
-            row_num = self._write_sequence_section(ws, row_num, sequence)
+            self._write_sequence_section(ws, sequence)
 
         # Auto-adjust column widths first (for columns with data)
         self._adjust_column_widths(ws)
@@ -558,17 +618,13 @@ class ExcelExporter:
         # Then apply dark background and set minimum widths for empty columns
         self._apply_dark_background_to_entire_sheet(ws)
     
-    def _write_transition_section(self, ws, row_num: int, transition: Dict[str, Any]) -> int:
+    def _write_transition_section(self, ws, transition: Dict[str, Any]):
         """
         Write a transition section with its permissions.
         
         Args:
             ws: Worksheet
-            row_num: Current row number
             transition: Transition data
-            
-        Returns:
-            Updated row number
         """
         trans_idx = transition['transition_index']
         perm_count = transition['permission_count']
@@ -580,51 +636,33 @@ class ExcelExporter:
             description = f"Transition {trans_idx}"
         
         # Transition header row
-        ws.cell(row=row_num, column=1, value='TRANSITION')
-        ws.cell(row=row_num, column=2, value=trans_idx)
-        ws.cell(row=row_num, column=3, value=description)
-        ws.cell(row=row_num, column=4, value=f'{perm_count} permissions')
-        
-        # Apply transition header style
-        for col in range(1, 6):
-            cell = ws.cell(row=row_num, column=col)
-            cell.fill = self.transition_fill
-            cell.font = self.transition_font
-        
-        row_num += 1
+        self._append_styled_row(
+            ws,
+            ('TRANSITION', trans_idx, description, f'{perm_count} permissions', None),
+            self._intern_style(ws, fill=self.transition_fill, font=self.transition_font)
+        )
         
         # Write permissions with beige background
+        data_style = self._intern_style(ws, fill=self.data_fill, font=self.data_font)
         for permission in transition['permissions']:
-            ws.cell(row=row_num, column=1, value='  Permission')
-            ws.cell(row=row_num, column=2, value=permission['permission_index'])
-            ws.cell(row=row_num, column=3, value=permission['permission_value'])
-            ws.cell(row=row_num, column=4, value='')
-            ws.cell(row=row_num, column=5, value=permission['comment'])
-            
-            # Apply dark theme to permission rows
-            for col in range(1, 6):
-                cell = ws.cell(row=row_num, column=col)
-                cell.fill = self.data_fill
-                cell.font = self.data_font
-            
-            row_num += 1
+            self._append_styled_row(ws, (
+                '  Permission',
+                permission['permission_index'],
+                permission['permission_value'],
+                '',
+                permission['comment'],
+            ), data_style)
         
         # Add blank row for separation
-        row_num += 1
-        
-        return row_num
+        ws.append(())
     
-    def _write_sequence_section(self, ws, row_num: int, sequence: Dict[str, Any]) -> int:
+    def _write_sequence_section(self, ws, sequence: Dict[str, Any]):
         """
         Write a sequence section with its steps, actions, and actuators.
         
         Args:
             ws: Worksheet
-            row_num: Current row number
             sequence: Sequence data
-            
-        Returns:
-            Updated row number
         """
         seq_idx = sequence['sequence_index']
         step_count = len(sequence['steps'])
@@ -636,75 +674,49 @@ class ExcelExporter:
             description = f"Sequence {seq_idx}"
         
         # Sequence header row
-        ws.cell(row=row_num, column=1, value='SEQUENCE')
-        ws.cell(row=row_num, column=2, value=seq_idx)
-        ws.cell(row=row_num, column=3, value=description)
-        ws.cell(row=row_num, column=4, value=f'{step_count} steps')
-        
-        # Apply sequence header style
-        for col in range(1, 6):
-            cell = ws.cell(row=row_num, column=col)
-            cell.fill = self.sequence_fill
-            cell.font = self.sequence_font
-        
-        row_num += 1
+        self._append_styled_row(
+            ws,
+            ('SEQUENCE', seq_idx, description, f'{step_count} steps', None),
+            self._intern_style(ws, fill=self.sequence_fill, font=self.sequence_font)
+        )
         
         # Write steps
         for step in sequence['steps']:
-            row_num = self._write_step_section(ws, row_num, seq_idx, step)
+            self._write_step_section(ws, seq_idx, step)
         
         # Add blank row for separation
-        row_num += 1
-        
-        return row_num
+        ws.append(())
     
-    def _write_step_section(self, ws, row_num: int, seq_idx: int, step: Dict[str, Any]) -> int:
+    def _write_step_section(self, ws, seq_idx: int, step: Dict[str, Any]):
         """
         Write a step section with its actions and actuators.
         
         Args:
             ws: Worksheet
-            row_num: Current row number
             seq_idx: Sequence index
             step: Step data
-            
-        Returns:
-            Updated row number
         """
         step_idx = step['step_index']
         action_count = len(step['actions'])
         
         # Step header row
-        ws.cell(row=row_num, column=1, value='  STEP')
-        ws.cell(row=row_num, column=2, value=step_idx)
-        ws.cell(row=row_num, column=3, value=f'Step {step_idx}')
-        ws.cell(row=row_num, column=4, value=f'{action_count} actions')
-        
-        # Apply step header style
-        for col in range(1, 6):
-            cell = ws.cell(row=row_num, column=col)
-            cell.fill = self.step_fill
-            cell.font = self.step_font
-        
-        row_num += 1
+        self._append_styled_row(
+            ws,
+            ('  STEP', step_idx, f'Step {step_idx}', f'{action_count} actions', None),
+            self._intern_style(ws, fill=self.step_fill, font=self.step_font)
+        )
         
         # Write actions
         for action in step['actions']:
-            row_num = self._write_action_section(ws, row_num, action)
-        
-        return row_num
+            self._write_action_section(ws, action)
     
-    def _write_action_section(self, ws, row_num: int, action: Dict[str, Any]) -> int:
+    def _write_action_section(self, ws, action: Dict[str, Any]):
         """
         Write an action section with its actuators.
         
         Args:
             ws: Worksheet
-            row_num: Current row number
             action: Action data
-            
-        Returns:
-            Updated row number
         """
         action_idx = action['action_index']
         action_name = action['action_name']
@@ -733,36 +745,20 @@ class ExcelExporter:
                 details += f' [UNKNOWN]'
         
         # Action header row
-        ws.cell(row=row_num, column=1, value='    ACTION')
-        ws.cell(row=row_num, column=2, value=action_idx)
-        ws.cell(row=row_num, column=3, value=action_name)
-        ws.cell(row=row_num, column=4, value=details)
-        ws.cell(row=row_num, column=5, value=state_formatted)
-        
-        # Apply action header style
-        for col in range(1, 6):
-            cell = ws.cell(row=row_num, column=col)
-            cell.fill = self.action_fill
-            cell.font = self.action_font
-        
-        row_num += 1
+        self._append_styled_row(
+            ws,
+            ('    ACTION', action_idx, action_name, details, state_formatted),
+            self._intern_style(ws, fill=self.action_fill, font=self.action_font)
+        )
         
         # Write actuators with beige background
+        data_style = self._intern_style(ws, fill=self.data_fill, font=self.data_font)
         for actuator in action['actuators']:
-            ws.cell(row=row_num, column=1, value='      Actuator')
-            ws.cell(row=row_num, column=2, value=actuator['index'])
-            ws.cell(row=row_num, column=3, value=actuator['description'])
-            ws.cell(row=row_num, column=4, value=mm_number)
-            
-            # Apply dark theme to actuator rows
-            for col in range(1, 6):
-                cell = ws.cell(row=row_num, column=col)
-                cell.fill = self.data_fill
-                cell.font = self.data_font
-            
-            row_num += 1
-
-        return row_num
+            self._append_styled_row(
+                ws,
+                ('      Actuator', actuator['index'], actuator['description'], mm_number, None),
+                data_style
+            )
 
     def _apply_dark_background_to_entire_sheet(self, ws):
         """
@@ -783,7 +779,7 @@ class ExcelExporter:
         # Set minimum width for empty columns to cover white space
         # Columns with data will keep their auto-adjusted width
         for col in range(1, 27):  # A-Z (1-26)
-            col_letter = ws.cell(row=1, column=col).column_letter
+            col_letter = get_column_letter(col)
             current_width = ws.column_dimensions[col_letter].width
 
             # If column is narrow (< 15), set to 20 to cover white space
@@ -2,14 +2,75 @@
 Sequence Detail exporter for generating the simplified Start Conditions format.
 This exporter creates a single-sheet Excel file showing the initial state of all cylinders and sensors.
 """
+import logging
+import re
+from collections import defaultdict
 from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
 from openpyxl.styles import Font, PatternFill, Alignment
-from typing import Dict, Any, List
-from ..core.constants import ExcelColors, ExcelFontSizes, MAX_COLUMN_WIDTH, DEFAULT_COLUMN_PADDING
+from openpyxl.utils import get_column_letter
+from typing import Dict, Any, List, Sequence
+from ..core.constants import ExcelColors, ExcelFontSizes, MAX_COLUMN_WIDTH, DEFAULT_COLUMN_PADDING, OUTPUT_FILE_BUFFER_SIZE
 from ..core.logger import get_logger
 
 logger = get_logger(__name__)
 
+SHEET_SEQUENCE_DETAIL = 'Sequence Detail'
+
+# Headers with 17 columns (12 original + 5 timing columns)
+_SEQUENCE_DETAIL_HEADERS = (
+    'ID',
+    'Style',
+    'Row Type',
+    'Actor Type',
+    'Actor/Unit',
+    'Custom Description',
+    'Custom \nDuration',
+    'Standard \nAction/\nStatus',
+    'Standard Duration',
+    'Actor/Group \nDescription',
+    'Actor/\nGroup \nName',
+    'Valve \nName',
+    'Ind. \nStart',      # Timing column (empty - filled manually)
+    'Dep. ID',           # Timing column (empty - filled manually)
+    'Start',             # Timing column (empty - filled manually)
+    'Duration',          # Timing column (empty - filled manually)
+    'End'                # Timing column (empty - filled manually)
+)
+
+# Precompiled patterns for the per-cylinder helpers
+_MM_NUM_RE = re.compile(r'MM(\d+)_')      # 'MM12_MMB3' -> 12
+_MM_TAG_RE = re.compile(r'MM(\d+)')       # 'MM12' -> 12
+_KJ_RE = re.compile(r'KJ(\d{1,2})')       # '_010UA1KJ1_KEB1_Hw' -> 'KJ1'
+
+# Precompiled patterns for the wait-condition / part helpers
+_PART_STATUS_RE = re.compile(r'Part\d+(?:Present|Valid|Detected)', re.IGNORECASE)
+_PART_NUM_RE = re.compile(r'Part(\d+)', re.IGNORECASE)
+_PART_SORT_RE = re.compile(r'Part(\d+)([A-Za-z]*)')
+_OPERATOR_NUM_RE = re.compile(r'Operator\s*(\d+)', re.IGNORECASE)
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)\s*(ms|s|sec|seconds?)', re.IGNORECASE)
+_RBT_NUM_RE = re.compile(r'Rbt[._]?(\d+)', re.IGNORECASE)
+_ROBOT_NUM_RE = re.compile(r'Robot\s*(\d+)', re.IGNORECASE)
+_MM_STATUS_RE = re.compile(r'MM\d+[._]?(Home|Work|stsAt)', re.IGNORECASE)
+_MM_STATUS_NUM_RE = re.compile(r'MM(\d+)[._]?(Home|Work|stsAt(Home|Work))', re.IGNORECASE)
+
+# Invariant parts of the fixed rows; only the ID (and style) vary per export
+_START_CONDITIONS_HEADER_ROW = (
+    'Common',                        # Style
+    'Start Conditions Header',       # Row Type
+    None,                            # Actor Type (empty)
+    None,                            # Actor/Unit (empty - filled manually)
+    'HomePos',                       # Custom Description
+    None, None, None, None, None, None,  # Other columns empty
+    None, None, None, None, None     # Timing columns (empty)
+)
+_EMPTY_AFTER_DESCRIPTION = (None,) * 11  # Custom Duration .. End
+
+# Raw action state -> "TO ..." string (see SequenceDetailExporter._format_state_robust)
+_ACTION_STATE_CACHE = {}
+# Cylinder state -> "AT ..." string (see SequenceDetailExporter._format_start_condition_state)
+_START_STATE_CACHE = {}
+
 
 class SequenceDetailExporter:
     """
@@ -17,26 +78,40 @@ class SequenceDetailExporter:
     Creates a single Excel file with one sheet showing the initial state.
     """
 
-    def __init__(self):
-        """Initialize the Sequence Detail exporter."""
-        # Header styles
-        self.header_fill = PatternFill(start_color=ExcelColors.HEADER_FILL, end_color=ExcelColors.HEADER_FILL, fill_type="solid")
-        self.header_font = Font(bold=True, color=ExcelColors.HEADER_FONT)
-        self.header_alignment = Alignment(horizontal="center", vertical="center")
+    # Style objects are immutable, so they are built once and shared by all instances
 
-        # Fixed State style (blue background, WHITE text)
-        self.fixed_state_fill = PatternFill(start_color=ExcelColors.TRANSITION_FILL, end_color=ExcelColors.TRANSITION_FILL, fill_type="solid")
-        self.fixed_state_font = Font(bold=True, color="FFFFFF", size=ExcelFontSizes.TRANSITION)
+    # Header styles
+    header_fill = PatternFill(start_color=ExcelColors.HEADER_FILL, end_color=ExcelColors.HEADER_FILL, fill_type="solid")
+    header_font = Font(bold=True, color=ExcelColors.HEADER_FONT)
+    header_alignment = Alignment(horizontal="center", vertical="center")
 
-        # Transition State style (green background, WHITE text)
-        self.transition_state_fill = PatternFill(start_color=ExcelColors.SEQUENCE_FILL, end_color=ExcelColors.SEQUENCE_FILL, fill_type="solid")
-        self.transition_state_font = Font(bold=True, color="FFFFFF", size=ExcelFontSizes.SEQUENCE)
+    # Fixed State style (blue background, WHITE text)
+    fixed_state_fill = PatternFill(start_color=ExcelColors.TRANSITION_FILL, end_color=ExcelColors.TRANSITION_FILL, fill_type="solid")
+    fixed_state_font = Font(bold=True, color="FFFFFF", size=ExcelFontSizes.TRANSITION)
 
-        # Data cell background - soft beige for eye comfort
-        self.data_fill = PatternFill(start_color=ExcelColors.DATA_FILL, end_color=ExcelColors.DATA_FILL, fill_type="solid")
+    # Transition State style (green background, WHITE text)
+    transition_state_fill = PatternFill(start_color=ExcelColors.SEQUENCE_FILL, end_color=ExcelColors.SEQUENCE_FILL, fill_type="solid")
+    transition_state_font = Font(bold=True, color="FFFFFF", size=ExcelFontSizes.SEQUENCE)
 
-        # Data cell font - WHITE text for dark background
-        self.data_font = Font(color="FFFFFF")
+    # Data cell background - soft beige for eye comfort
+    data_fill = PatternFill(start_color=ExcelColors.DATA_FILL, end_color=ExcelColors.DATA_FILL, fill_type="solid")
+
+    # Data cell font - WHITE text for dark background
+    data_font = Font(color="FFFFFF")
+
+    def __init__(self):
+        """Initialize the Sequence Detail exporter."""
+        # Interned style arrays keyed by (fill, font, alignment); only valid for
+        # the workbook they were registered in, so reset per sheet
+        self._style_cache = {}
+
+        # Per-export state; reset at the start of every export by
+        # _create_sequence_detail_sheet()
+        self._pending_rows = []
+        self._column_max_lengths = [0] * len(_SEQUENCE_DETAIL_HEADERS)
+        self._valve_name_cache = {}
+        self._allparts_wait_conditions = None
+        self._part_wait_conditions = {}
 
     def export(self, common_data: Dict[str, Any], model_data: Dict[str, Any],
                digital_inputs_data: Dict[str, Any], actuator_groups_data: Dict[str, Any],
@@ -93,22 +168,16 @@ class SequenceDetailExporter:
 
         # Try to export with error handling
         try:
-            wb = Workbook()
-
-            # Remove default sheet
-            if 'Sheet' in wb.sheetnames:
-                wb.remove(wb['Sheet'])
-
-            # Create the main Sequence Detail sheet
+            # Build the main Sequence Detail rows
             self._create_sequence_detail_sheet(
-                wb, common_data, model_data, digital_inputs_data,
+                common_data, model_data, digital_inputs_data,
                 actuator_groups_data, valve_mappings_data,
                 all_actuators_data, transitions_data
             )
 
-            # Save with error handling
+            # Save with error handling (the only write to output_path)
             try:
-                wb.save(output_path)
+                self._save_with_openpyxl(output_path)
                 logger.info(f"✅ Successfully created Sequence Detail: {output_path}")
             except PermissionError:
                 raise Exception(
@@ -120,15 +189,19 @@ class SequenceDetailExporter:
             logger.error(f"Error creating Sequence Detail export: {str(e)}")
             raise
 
-    def _create_sequence_detail_sheet(self, wb: Workbook, common_data: Dict[str, Any],
+    def _create_sequence_detail_sheet(self, common_data: Dict[str, Any],
                                      model_data: Dict[str, Any], digital_inputs_data: Dict[str, Any],
                                      actuator_groups_data: Dict[str, Any], valve_mappings_data: Dict[str, Any],
                                      all_actuators_data: Dict[str, Any], transitions_data: Dict[str, Any]):
         """
-        Create the Sequence Detail sheet with Start Conditions and Transitions.
+        Build the Sequence Detail rows with Start Conditions and Transitions.
+
+        Rows are buffered in self._pending_rows together with their styles;
+        _save_with_openpyxl() writes them out afterwards.
+        This method never touches the output file: export() saves exactly once,
+        after every row has been built.
 
         Args:
-            wb: Workbook object
             common_data: Common sequences data
             model_data: Model sequences data
             digital_inputs_data: Digital inputs data
@@ -137,35 +210,19 @@ class SequenceDetailExporter:
             all_actuators_data: Complete list of ALL actuators from MM routines
             transitions_data: Transitions data with permissions
         """
-        ws = wb.create_sheet("Sequence Detail")
-
-        # Headers with 17 columns (12 original + 5 timing columns)
-        headers = [
-            'ID',
-            'Style',
-            'Row Type',
-            'Actor Type',
-            'Actor/Unit',
-            'Custom Description',
-            'Custom \nDuration',
-            'Standard \nAction/\nStatus',
-            'Standard Duration',
-            'Actor/Group \nDescription',
-            'Actor/\nGroup \nName',
-            'Valve \nName',
-            'Ind. \nStart',      # Timing column (empty - filled manually)
-            'Dep. ID',           # Timing column (empty - filled manually)
-            'Start',             # Timing column (empty - filled manually)
-            'Duration',          # Timing column (empty - filled manually)
-            'End'                # Timing column (empty - filled manually)
-        ]
+        # Rows are buffered until the sheet is complete: streaming writers emit
+        # column widths before the first row, so widths must be known up front
+        self._pending_rows = []
+        self._column_max_lengths = [0] * len(_SEQUENCE_DETAIL_HEADERS)
+
+        # Valve names per (formatted state, MM) for this export's valve mappings
+        self._valve_name_cache = {}
+        # "AllParts" / single-part wait-condition expansions, built on first use
+        self._allparts_wait_conditions = None
+        self._part_wait_conditions = {}
 
         # Write headers
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num, value=header)
-            cell.fill = self.header_fill
-            cell.font = self.header_font
-            cell.alignment = self.header_alignment
+        self._append_row(_SEQUENCE_DETAIL_HEADERS, self.header_fill, self.header_font, self.header_alignment)
 
         # Build MM description mapping
         mm_to_description = {}
@@ -179,112 +236,73 @@ class SequenceDetailExporter:
             mm_to_valve = valve_mappings_data['valve_mappings']
 
         # Build initial cylinder state from ALL actuators extracted from MM routines
-        # Key: (mm_number, index) for uniqueness, Value: {actuator_name, state, mm_number, description, manifold, valve_work, valve_home}
-        cylinder_state = {}
+        # Stored as parallel lists (one slot per cylinder) plus a {mm_number: {index: slot}} map
+        slots_by_mm = {}
+        cyl_names = []
+        cyl_states = []
+        cyl_sort_keys = []  # (MM number, index) per slot
+        cyl_descriptions = []
+        cyl_work_valve_names = []
+        cyl_home_valve_names = []
 
         # Initialize ALL cylinders with HOME state
         if all_actuators_data and all_actuators_data.get('actuators_by_mm'):
             for mm_number, actuators in all_actuators_data['actuators_by_mm'].items():
                 mm_description = mm_to_description.get(mm_number, '')
+                mm_sort_number = self._extract_mm_number_from_key(mm_number)
 
-                # Get valve mapping information
-                manifold = ''
-                valve_work = ''
-                valve_home = ''
-                if mm_number in mm_to_valve:
-                    valve_info = mm_to_valve[mm_number]
-                    manifold = valve_info.get('manifold', '')
-                    valve_work = valve_info.get('valve_work', '')
-                    valve_home = valve_info.get('valve_home', '')
+                # Valve names depend only on the MM group and WORK/HOME, so resolve both once per MM
+                work_valve_name = self._calculate_valve_name('WORK', mm_number, mm_to_valve)
+                home_valve_name = self._calculate_valve_name('HOME', mm_number, mm_to_valve)
+                mm_slots = slots_by_mm.setdefault(mm_number, {})
 
                 # Add all actuators with default HOME state
                 for actuator in actuators:
-                    actuator_name = actuator['description']
                     actuator_index = actuator['index']
-                    # Use (mm_number, index) as key to ensure uniqueness
-                    unique_key = (mm_number, actuator_index)
-                    cylinder_state[unique_key] = {
-                        'actuator_name': actuator_name,
-                        'state': 'HOME',  # Store as simple state, will format as "AT HOME" for start conditions
-                        'mm_number': mm_number,
-                        'description': mm_description,
-                        'manifold': manifold,
-                        'valve_work': valve_work,
-                        'valve_home': valve_home
-                    }
-
-        # Apply overrides from Common sequences
+                    # (mm_number, index) identifies a cylinder uniquely
+                    slot = mm_slots.get(actuator_index)
+                    if slot is not None:
+                        # Duplicate key: last definition wins, first position is kept
+                        cyl_names[slot] = actuator['description']
+                        continue
+
+                    mm_slots[actuator_index] = len(cyl_names)
+                    cyl_names.append(actuator['description'])
+                    cyl_states.append('HOME')  # Simple state, formatted as "AT HOME" for start conditions
+                    cyl_sort_keys.append((mm_sort_number, actuator_index))
+                    cyl_descriptions.append(mm_description)
+                    cyl_work_valve_names.append(work_valve_name)
+                    cyl_home_valve_names.append(home_valve_name)
+
+        # Apply overrides from Common sequences, then the Model's FIRST sequence (Model wins)
+        override_sequences = []
         if common_data and common_data.get('sequences'):
-            for sequence in common_data['sequences']:
-                for step in sequence['steps']:
-                    for action in step['actions']:
-                        state = action.get('state', '')
-                        state_formatted = self._format_state_robust(state)
-                        mm_number = action.get('mm_number', '')
-
-                        for actuator in action.get('actuators', []):
-                            actuator_index = actuator['index']
-                            unique_key = (mm_number, actuator_index)
-                            # Override state if this actuator exists
-                            if unique_key in cylinder_state:
-                                cylinder_state[unique_key]['state'] = state_formatted
-
-        # Apply overrides from Model's FIRST sequence
+            override_sequences.extend(common_data['sequences'])
         if model_data and model_data.get('sequences'):
-            first_sequence = model_data['sequences'][0] if model_data['sequences'] else None
-            if first_sequence:
-                for step in first_sequence['steps']:
-                    for action in step['actions']:
-                        state = action.get('state', '')
-                        state_formatted = self._format_state_robust(state)
-                        mm_number = action.get('mm_number', '')
-
-                        for actuator in action.get('actuators', []):
-                            actuator_index = actuator['index']
-                            unique_key = (mm_number, actuator_index)
-                            # Override state if this actuator exists
-                            if unique_key in cylinder_state:
-                                cylinder_state[unique_key]['state'] = state_formatted
-
-        # Sort cylinders by MM group and index
-        sorted_cylinders = sorted(
-            cylinder_state.items(),
-            key=lambda x: (
-                self._extract_mm_number_from_key(x[0][0]),  # Sort by MM number from key tuple
-                x[0][1]  # Then by index
-            )
-        )
+            override_sequences.append(model_data['sequences'][0])
+        self._apply_overrides(slots_by_mm, cyl_states, override_sequences)
+
+        # Sort cylinder slots by MM group and index (keys were built once per MM above)
+        sorted_slots = sorted(range(len(cyl_names)), key=cyl_sort_keys.__getitem__)
 
         # Start writing data rows
-        row_num = 2
         id_counter = 1
 
         # Write Start Conditions Header row
-        row_data = [
-            id_counter,                      # ID
-            'Common',                        # Style
-            'Start Conditions Header',       # Row Type
-            None,                            # Actor Type (empty)
-            None,                            # Actor/Unit (empty - filled manually)
-            'HomePos',                       # Custom Description
-            None, None, None, None, None, None,  # Other columns empty
-            None, None, None, None, None     # Timing columns (empty)
-        ]
-        for col_num, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_num, column=col_num, value=value)
-            cell.fill = self.data_fill
-            cell.font = self.data_font
-        row_num += 1
+        row_data = (id_counter, *_START_CONDITIONS_HEADER_ROW)
+        self._append_row(row_data, self.data_fill, self.data_font)
         id_counter += 1
 
         # Write cylinder rows (Start Conditions, CylinderUnits)
-        for unique_key, info in sorted_cylinders:
-            actuator_name = info['actuator_name']
+        for slot in sorted_slots:
+            actuator_name = cyl_names[slot]
 
-            # Calculate valve name based on state using helper method
-            mm_number = info['mm_number']
-            state = info['state']
-            valve_name = self._calculate_valve_name(state, mm_number, mm_to_valve)
+            # Pick the precomputed valve name for the cylinder's state
+            state = cyl_states[slot]
+            if 'WORK' in str(state).upper():
+                valve_name = cyl_work_valve_names[slot]
+            else:
+                valve_name = cyl_home_valve_names[slot]
 
             # Format state for Start Conditions: use "AT" prefix (not "TO")
             state_formatted = self._format_start_condition_state(state)
@@ -302,41 +320,38 @@ class SequenceDetailExporter:
                 None,                            # Custom Duration (empty)
                 state_formatted,                 # Standard Action/Status (AT WORK/HOME)
                 0.0,                             # Standard Duration
-                info['description'],             # Actor/Group Description
+                cyl_descriptions[slot],          # Actor/Group Description
                 actor_group_name,                # Actor/Group Name (=MM1-MMB1)
                 valve_name,                      # Valve Name
                 None, None, None, None, None     # Timing columns (empty)
             ]
 
-            for col_num, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.fill = self.data_fill
-                cell.font = self.data_font
-            row_num += 1
+            self._append_row(row_data, self.data_fill, self.data_font)
             id_counter += 1
 
         # Extract and write sensor rows
         # Only include sensors that have part assignments (not 'N/A')
         if digital_inputs_data and digital_inputs_data.get('digital_inputs'):
             # Group sensors by part assignment
-            sensors_by_part = {}
+            sensors_by_part = defaultdict(list)
             for sensor in digital_inputs_data['digital_inputs']:
-                tag_name = sensor.get('tag_name', '')
-                part_assignment = sensor.get('part_assignment', 'N/A')
-
                 # Only include sensors with actual part assignments and starting with BG (part sensors)
-                if part_assignment != 'N/A' and tag_name.startswith('BG'):
-                    if part_assignment not in sensors_by_part:
-                        sensors_by_part[part_assignment] = []
+                # Most inputs are unassigned, so reject on part assignment first
+                part_assignment = sensor.get('part_assignment', 'N/A')
+                if part_assignment == 'N/A':
+                    continue
+                tag_name = sensor.get('tag_name', '')
+                if tag_name.startswith('BG'):
                     sensors_by_part[part_assignment].append(tag_name)
 
-            # Sort by part number using robust part name sorting
+            # Sort each part's sensors in place once, then parts by part number
+            for sensors in sensors_by_part.values():
+                sensors.sort()
             sorted_parts = sorted(sensors_by_part.keys(), key=self._sort_part_name)
 
             # Write sensor rows
             for part_name in sorted_parts:
-                sensors = sorted(sensors_by_part[part_name])
-                for sensor_name in sensors:
+                for sensor_name in sensors_by_part[part_name]:
                     # Format sensor name with = and -
                     sensor_name_formatted = self._format_actor_group_name(sensor_name)
 
@@ -356,18 +371,69 @@ class SequenceDetailExporter:
                         None, None, None, None, None     # Timing columns (empty)
                     ]
 
-                    for col_num, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=row_num, column=col_num, value=value)
-                        cell.fill = self.data_fill
-                        cell.font = self.data_font
-                    row_num += 1
+                    self._append_row(row_data, self.data_fill, self.data_font)
                     id_counter += 1
 
         # Write transitions section (Fixed State + Wait Conditions + Actions)
-        self._write_transitions_section(ws, row_num, id_counter, transitions_data, digital_inputs_data, model_data, actuator_groups_data, valve_mappings_data)
+        self._write_transitions_section(id_counter, transitions_data, digital_inputs_data, model_data, mm_to_description, mm_to_valve)
+
+    def _save_with_openpyxl(self, output_path: str):
+        """
+        Stream the buffered rows to an openpyxl write-only workbook and save it.
+
+        Buffering is deliberate: a write-only sheet writes its <cols> widths
+        before the first row, and the widths depend on every row's contents.
+        The whole sheet is therefore held in self._pending_rows as plain tuples
+        (far smaller than a normal workbook's Cell objects) until this call, so
+        write-only mode saves the per-cell objects but not the row data itself.
 
-        # Auto-adjust column widths
+        Args:
+            output_path: Path for the output Excel file
+        """
+        # Write-only workbook: rows are streamed to disk instead of
+        # materializing a Cell object for every value
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(SHEET_SEQUENCE_DETAIL)
+        self._style_cache = {}
+
+        # Auto-adjust column widths, then stream the buffered rows
         self._adjust_column_widths(ws)
+        for row_data, fill, font, alignment in self._pending_rows:
+            style = self._intern_style(ws, fill, font, alignment)
+            ws.append([Cell(ws, row=1, column=1, value=value, style_array=style) for value in row_data])
+        self._pending_rows = []
+
+        # Large write buffer: the zip writer otherwise issues many small writes
+        with open(output_path, 'wb', buffering=OUTPUT_FILE_BUFFER_SIZE) as fh:
+            wb.save(fh)
+
+    def _apply_overrides(self, slots_by_mm: Dict[str, Dict[int, int]], cyl_states: List[str],
+                         sequences: List[Dict[str, Any]]):
+        """
+        Override cylinder states with the states commanded by the given sequences.
+
+        Only actuators already present in slots_by_mm are updated; later
+        actions win over earlier ones.
+
+        Args:
+            slots_by_mm: Slot number keyed by MM number, then actuator index
+            cyl_states: Per-slot cylinder states, updated in place
+            sequences: Sequences whose actions override the current states
+        """
+        for sequence in sequences:
+            for step in sequence['steps']:
+                for action in step['actions']:
+                    # Skip actions on MM groups with no known cylinders before formatting the state
+                    mm_slots = slots_by_mm.get(action.get('mm_number', ''))
+                    if not mm_slots:
+                        continue
+                    state_formatted = self._format_state_robust(action.get('state', ''))
+
+                    for actuator in action.get('actuators', []):
+                        # Override state if this actuator exists
+                        slot = mm_slots.get(actuator['index'])
+                        if slot is not None:
+                            cyl_states[slot] = state_formatted
 
     def _extract_mm_number(self, actuator_name: str) -> int:
         """
@@ -379,8 +445,7 @@ class SequenceDetailExporter:
         Returns:
             MM number as integer (e.g., 1, 12)
         """
-        import re
-        match = re.match(r'MM(\d+)_', actuator_name)
+        match = _MM_NUM_RE.match(actuator_name)
         return int(match.group(1)) if match else 999
 
     def _extract_mm_number_from_key(self, mm_number: str) -> int:
@@ -393,8 +458,7 @@ class SequenceDetailExporter:
         Returns:
             MM number as integer (e.g., 1, 12)
         """
-        import re
-        match = re.match(r'MM(\d+)', mm_number)
+        match = _MM_TAG_RE.match(mm_number)
         return int(match.group(1)) if match else 999
 
     def _extract_kj_name(self, manifold: str) -> str:
@@ -407,11 +471,10 @@ class SequenceDetailExporter:
         Returns:
             KJ name (e.g., 'KJ1') or 'N/A' if not found
         """
-        import re
         if not manifold:
             return 'N/A'
 
-        match = re.search(r'KJ(\d{1,2})', manifold)
+        match = _KJ_RE.search(manifold)
         return f"KJ{match.group(1)}" if match else 'N/A'
 
     def _build_valve_diagram_name(self, kj_name: str, valve_position: str) -> str:
@@ -434,65 +497,48 @@ class SequenceDetailExporter:
         # Prefix with single quote to force Excel to treat as text (not formula)
         return f"'={kj_name}-QMB{valve_num}"
 
-    def _write_transitions_section(self, ws, row_num: int, id_counter: int, transitions_data: Dict[str, Any],
+    def _write_transitions_section(self, id_counter: int, transitions_data: Dict[str, Any],
                                     digital_inputs_data: Dict[str, Any], model_data: Dict[str, Any],
-                                    actuator_groups_data: Dict[str, Any], valve_mappings_data: Dict[str, Any]) -> tuple:
+                                    mm_to_description: Dict[str, str],
+                                    mm_to_valve: Dict[str, Dict[str, str]]) -> int:
         """
         Write transitions section with Sequence Header, Fixed State, Wait Conditions, Actions, and End Of Sequence rows.
 
         Args:
-            ws: Worksheet
-            row_num: Current row number
             id_counter: Current ID counter
             transitions_data: Transitions data
             digital_inputs_data: Digital inputs data
             model_data: Model data for extracting sequence style and sequences
-            actuator_groups_data: Actuator groups data for MM descriptions
-            valve_mappings_data: Valve mappings data for valve info
+            mm_to_description: MM group descriptions
+            mm_to_valve: Valve mappings
 
         Returns:
-            Tuple of (updated row_num, updated id_counter)
+            Updated ID counter
         """
         if not transitions_data or not transitions_data.get('transitions'):
-            return row_num, id_counter
+            return id_counter
 
         # Extract model name for Style column (e.g., "EmStatesAndSequences_R2S" -> "R2S")
         routine_name = model_data.get('routine_name', '') if model_data else ''
         sequence_style = routine_name.split('_')[-1] if '_' in routine_name else routine_name
 
-        # Build MM description mapping
-        mm_to_description = {}
-        if actuator_groups_data and actuator_groups_data.get('actuator_groups'):
-            for group in actuator_groups_data['actuator_groups']:
-                mm_to_description[group['tag_name']] = group['description']
-
-        # Build valve mapping dictionary
-        mm_to_valve = {}
-        if valve_mappings_data and valve_mappings_data.get('valve_mappings'):
-            mm_to_valve = valve_mappings_data['valve_mappings']
-
         # Get sequences from model_data
         sequences = model_data.get('sequences', []) if model_data else []
 
-        # IMPROVED: Build sequence lookup dictionary for faster access and better matching
-        sequences_by_index = {seq['sequence_index']: seq for seq in sequences}
+        # Resolve the sequence for every transition up front (one entry per transition)
+        matched_sequences = self._match_sequences_to_transitions(transitions_data['transitions'], sequences)
 
         # Write Sequence Header row at the beginning
-        row_data = [
+        row_data = (
             id_counter, sequence_style, 'Sequence Header',
             None, None, f"{sequence_style} Sequence",
-            None, None, None, None, None, None,
-            None, None, None, None, None
-        ]
-        for col_num, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_num, column=col_num, value=value)
-            cell.fill = self.data_fill
-            cell.font = self.data_font
-        row_num += 1
+            *_EMPTY_AFTER_DESCRIPTION
+        )
+        self._append_row(row_data, self.data_fill, self.data_font)
         id_counter += 1
 
         # Process each transition
-        for transition_idx, transition in enumerate(transitions_data['transitions']):
+        for transition, matching_sequence in zip(transitions_data['transitions'], matched_sequences):
             transition_index = transition['transition_index']
             transition_name = transition.get('transition_name', f"State{transition_index}")
 
@@ -525,12 +571,7 @@ class SequenceDetailExporter:
                 None, None, None, None, None     # Timing columns (empty)
             ]
 
-            for col_num, value in enumerate(row_data, 1):
-                cell = ws.cell(row=row_num, column=col_num, value=value)
-                cell.fill = self.fixed_state_fill
-                cell.font = self.fixed_state_font
-
-            row_num += 1
+            self._append_row(row_data, self.fixed_state_fill, self.fixed_state_font)
             id_counter += 1
 
             # Write Wait Conditions rows (expand permissions)
@@ -544,46 +585,22 @@ class SequenceDetailExporter:
                         id_counter,                                    # ID
                         sequence_style,                                # Style
                         'Wait Conditions',                             # Row Type
-                        wait_condition.get('actor_type'),              # Actor Type
+                        wait_condition['actor_type'],                  # Actor Type
                         None,                                          # Actor/Unit (empty - filled manually)
-                        wait_condition.get('custom_desc'),             # Custom Description
-                        wait_condition.get('custom_duration'),         # Custom Duration
-                        wait_condition.get('status'),                  # Standard Action/Status
-                        wait_condition.get('standard_duration', 0.0),  # Standard Duration
-                        wait_condition.get('group_desc'),              # Actor/Group Description
-                        wait_condition.get('group_name'),              # Actor/Group Name
+                        wait_condition['custom_desc'],                 # Custom Description
+                        wait_condition['custom_duration'],             # Custom Duration
+                        wait_condition['status'],                      # Standard Action/Status
+                        wait_condition['standard_duration'],           # Standard Duration
+                        wait_condition['group_desc'],                  # Actor/Group Description
+                        wait_condition['group_name'],                  # Actor/Group Name
                         None,                                          # Valve Name (empty)
                         None, None, None, None, None                   # Timing columns (empty)
                     ]
 
-                    for col_num, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=row_num, column=col_num, value=value)
-                        cell.fill = self.data_fill
-                        cell.font = self.data_font
-
-                    row_num += 1
+                    self._append_row(row_data, self.data_fill, self.data_font)
                     id_counter += 1
 
-            # IMPROVED: Multi-strategy fallback for sequence-to-transition matching
-            matching_sequence = None
-
-            # Strategy 1: Direct index match
-            if transition_index in sequences_by_index:
-                matching_sequence = sequences_by_index[transition_index]
-
-            # Strategy 2: Try index + 1 (common pattern where transition 0 -> sequence 1)
-            elif (transition_index + 1) in sequences_by_index:
-                matching_sequence = sequences_by_index[transition_index + 1]
-                if self.debug if hasattr(self, 'debug') else False:
-                    logger.debug(f"Matched transition {transition_index} to sequence {transition_index + 1} (offset by 1)")
-
-            # Strategy 3: Use sequence at same position in list (fallback for irregular indexing)
-            elif transition_idx < len(sequences):
-                matching_sequence = sequences[transition_idx]
-                if self.debug if hasattr(self, 'debug') else False:
-                    logger.debug(f"Matched transition {transition_index} to sequence at position {transition_idx} (by position)")
-
-            # Strategy 4: Log warning if no match found
+            # Log warning if no match found
             if not matching_sequence:
                 logger.warning(f"⚠️ Warning: No sequence found for transition {transition_index} ({transition_name})")
             else:
@@ -608,45 +625,77 @@ class SequenceDetailExporter:
                     None, None, None, None, None     # Timing columns (empty)
                 ]
 
-                for col_num, value in enumerate(row_data, 1):
-                    cell = ws.cell(row=row_num, column=col_num, value=value)
-                    cell.fill = self.transition_state_fill
-                    cell.font = self.transition_state_font
-
-                row_num += 1
+                self._append_row(row_data, self.transition_state_fill, self.transition_state_font)
                 id_counter += 1
 
                 # Now write action rows for this sequence (Step1, Step2, Step3)
-                row_num, id_counter = self._write_sequence_actions(
-                    ws, row_num, id_counter, matching_sequence, sequence_style,
+                id_counter = self._write_sequence_actions(
+                    id_counter, matching_sequence, sequence_style,
                     mm_to_description, mm_to_valve
                 )
 
         # Write End Of Sequence row
-        row_data = [
+        row_data = (
             id_counter, sequence_style, 'Sequence Header',
             None, None, 'End Of Sequence',
-            None, None, None, None, None, None,
-            None, None, None, None, None
-        ]
-        for col_num, value in enumerate(row_data, 1):
-            cell = ws.cell(row=row_num, column=col_num, value=value)
-            cell.fill = self.data_fill
-            cell.font = self.data_font
-        row_num += 1
+            *_EMPTY_AFTER_DESCRIPTION
+        )
+        self._append_row(row_data, self.data_fill, self.data_font)
         id_counter += 1
 
-        return row_num, id_counter
+        return id_counter
+
+    def _match_sequences_to_transitions(self, transitions: List[Dict[str, Any]],
+                                        sequences: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Resolve the sequence that belongs to each transition.
+
+        Strategies, in order: direct index match, index + 1 (transition 0 ->
+        sequence 1), then the sequence at the same position in the list.
+
+        Args:
+            transitions: Transitions in output order
+            sequences: Sequences from the model data
 
-    def _write_sequence_actions(self, ws, row_num: int, id_counter: int, sequence: Dict[str, Any],
+        Returns:
+            List aligned with transitions holding the matched sequence or None
+        """
+        sequences_by_index = {seq['sequence_index']: seq for seq in sequences}
+        # Build the debug messages only when they will actually be emitted
+        debug_enabled = logger.isEnabledFor(logging.DEBUG)
+
+        matched = []
+        for transition_idx, transition in enumerate(transitions):
+            transition_index = transition['transition_index']
+            matching_sequence = None
+
+            # Strategy 1: Direct index match
+            if transition_index in sequences_by_index:
+                matching_sequence = sequences_by_index[transition_index]
+
+            # Strategy 2: Try index + 1 (common pattern where transition 0 -> sequence 1)
+            elif (transition_index + 1) in sequences_by_index:
+                matching_sequence = sequences_by_index[transition_index + 1]
+                if debug_enabled:
+                    logger.debug(f"Matched transition {transition_index} to sequence {transition_index + 1} (offset by 1)")
+
+            # Strategy 3: Use sequence at same position in list (fallback for irregular indexing)
+            elif transition_idx < len(sequences):
+                matching_sequence = sequences[transition_idx]
+                if debug_enabled:
+                    logger.debug(f"Matched transition {transition_index} to sequence at position {transition_idx} (by position)")
+
+            matched.append(matching_sequence)
+
+        return matched
+
+    def _write_sequence_actions(self, id_counter: int, sequence: Dict[str, Any],
                                  sequence_style: str, mm_to_description: Dict[str, str],
-                                 mm_to_valve: Dict[str, Dict[str, str]]) -> tuple:
+                                 mm_to_valve: Dict[str, Dict[str, str]]) -> int:
         """
         Write sequence action rows with Step1, Step2, Step3 row types.
 
         Args:
-            ws: Worksheet
-            row_num: Current row number
             id_counter: Current ID counter
             sequence: Sequence data with steps and actions
             sequence_style: Style name (e.g., "R2S")
@@ -654,8 +703,15 @@ class SequenceDetailExporter:
             mm_to_valve: Valve mappings
 
         Returns:
-            Tuple of (updated row_num, updated id_counter)
+            Updated ID counter
         """
+        # Bind attributes used in the per-actuator loop to locals
+        append_row = self._append_row
+        data_fill = self.data_fill
+        data_font = self.data_font
+        format_state = self._format_state_robust
+        valve_name_cache = self._valve_name_cache
+
         # Process each step with step number
         for step_idx, step in enumerate(sequence.get('steps', []), 1):
             step_name = f"Step{step_idx}"  # "Step1", "Step2", "Step3"
@@ -663,13 +719,19 @@ class SequenceDetailExporter:
             for action in step.get('actions', []):
                 mm_number = action.get('mm_number', '')
                 state = action.get('state', '')
-                state_formatted = self._format_state_robust(state)
+                state_formatted = format_state(state)
 
                 # Get MM group description
                 mm_description = mm_to_description.get(mm_number, '')
 
-                # Calculate valve name using helper method
-                valve_name = self._calculate_valve_name(state_formatted, mm_number, mm_to_valve)
+                # Calculate valve name using helper method (same MM + state recurs across steps/sequences)
+                valve_key = (state_formatted, mm_number)
+                if valve_key in valve_name_cache:
+                    valve_name = valve_name_cache[valve_key]
+                else:
+                    valve_name = valve_name_cache[valve_key] = self._calculate_valve_name(
+                        state_formatted, mm_number, mm_to_valve
+                    )
 
                 # Write one row per actuator
                 for actuator in action.get('actuators', []):
@@ -694,15 +756,10 @@ class SequenceDetailExporter:
                         None, None, None, None, None     # Timing columns (empty)
                     ]
 
-                    for col_num, value in enumerate(row_data, 1):
-                        cell = ws.cell(row=row_num, column=col_num, value=value)
-                        cell.fill = self.data_fill
-                        cell.font = self.data_font
-
-                    row_num += 1
+                    append_row(row_data, data_fill, data_font)
                     id_counter += 1
 
-        return row_num, id_counter
+        return id_counter
 
     def _expand_permission_to_wait_conditions(self, permission: Dict[str, Any],
                                                digital_inputs_data: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -714,82 +771,53 @@ class SequenceDetailExporter:
             digital_inputs_data: Digital inputs data
 
         Returns:
-            List of wait condition dictionaries
+            List of wait condition dictionaries; every key is always present
         """
-        import re
-
         permission_value = permission.get('permission_value', '')
         comment = permission.get('comment', '')
+        # Lower-cased once so cheap substring checks can skip the case-insensitive regexes
+        value_lower = permission_value.lower()
 
         wait_conditions = []
 
         # Pattern 1: All Parts Present/Valid - expand to individual sensors
         if 'AllParts' in permission_value:
-            if digital_inputs_data and digital_inputs_data.get('digital_inputs'):
-                # Sort sensors by part assignment for consistent output
-                sensors_list = []
-                for digital_input in digital_inputs_data['digital_inputs']:
-                    part_assignment = digital_input.get('part_assignment', 'N/A')
-
-                    # Only include sensors with part assignments and starting with BG
-                    if part_assignment == 'N/A' or not digital_input['tag_name'].startswith('BG'):
-                        continue
-
-                    sensors_list.append((part_assignment, digital_input))
-
-                # Sort by part assignment using robust part name sorting
-                sensors_list.sort(key=lambda x: self._sort_part_name(x[0]))
-
-                for part_assignment, digital_input in sensors_list:
-                    tag_name = digital_input['tag_name']
-                    description = digital_input.get('description', '')
-
-                    # Format sensor name with = and -
-                    sensor_name_formatted = self._format_actor_group_name(tag_name)
-
-                    wait_conditions.append({
-                        'actor_type': 'SensorUnits',
-                        'actor_unit': None,
-                        'custom_desc': None,
-                        'custom_duration': None,
-                        'status': 'ON',
-                        'standard_duration': 0.0,
-                        'group_desc': description or part_assignment,
-                        'group_name': sensor_name_formatted
-                    })
+            # The expansion only depends on the digital inputs, so build it once per export
+            if self._allparts_wait_conditions is None:
+                self._allparts_wait_conditions = self._build_allparts_wait_conditions(digital_inputs_data)
+            wait_conditions.extend(self._allparts_wait_conditions)
 
         # Pattern 2: Specific Part Present (NEW) - e.g., Part1Present, Part2Valid
-        elif re.search(r'Part\d+(?:Present|Valid|Detected)', permission_value, re.IGNORECASE):
+        elif 'part' in value_lower and _PART_STATUS_RE.search(permission_value):
             # Extract part number
-            match = re.search(r'Part(\d+)', permission_value, re.IGNORECASE)
+            match = _PART_NUM_RE.search(permission_value)
             if match and digital_inputs_data and digital_inputs_data.get('digital_inputs'):
                 part_num = match.group(1)
                 target_part = f"Part{part_num}"
 
-                # Find sensors for this specific part
-                for digital_input in digital_inputs_data['digital_inputs']:
-                    part_assignment = digital_input.get('part_assignment', 'N/A')
-
-                    if part_assignment == target_part and digital_input['tag_name'].startswith('BG'):
-                        tag_name = digital_input['tag_name']
-                        description = digital_input.get('description', '')
-
-                        # Format sensor name with = and -
-                        sensor_name_formatted = self._format_actor_group_name(tag_name)
-
-                        wait_conditions.append({
+                # Sensors for this specific part; each part is expanded once per export
+                part_conditions = self._part_wait_conditions.get(target_part)
+                if part_conditions is None:
+                    part_conditions = self._part_wait_conditions[target_part] = [
+                        {
                             'actor_type': 'SensorUnits',
                             'actor_unit': None,
                             'custom_desc': None,
                             'custom_duration': None,
                             'status': 'ON',
                             'standard_duration': 0.0,
-                            'group_desc': description or part_assignment,
-                            'group_name': sensor_name_formatted
-                        })
+                            'group_desc': digital_input.get('description', '') or target_part,
+                            # Format sensor name with = and -
+                            'group_name': self._format_actor_group_name(digital_input['tag_name'])
+                        }
+                        for digital_input in digital_inputs_data['digital_inputs']
+                        if digital_input.get('part_assignment', 'N/A') == target_part
+                        and digital_input['tag_name'].startswith('BG')
+                    ]
+                wait_conditions.extend(part_conditions)
 
         # Pattern 3: Timer/Delay conditions (NEW) - extract duration
-        elif re.search(r'(timer|delay|wait)', permission_value, re.IGNORECASE):
+        elif 'timer' in value_lower or 'delay' in value_lower or 'wait' in value_lower:
             duration = self._extract_duration(permission_value) or self._extract_duration(comment)
 
             wait_conditions.append({
@@ -798,6 +826,7 @@ class SequenceDetailExporter:
                 'custom_desc': comment or permission_value,
                 'custom_duration': duration,
                 'status': None,
+                'standard_duration': 0.0,
                 'group_desc': None,
                 'group_name': None
             })
@@ -805,7 +834,7 @@ class SequenceDetailExporter:
         # Pattern 4: Operators - manual operator actions
         elif 'Operator' in comment or 'operator' in comment.lower() or 'Load' in comment or 'Leave' in comment:
             # Extract operator number
-            operator_match = re.search(r'Operator\s*(\d+)', comment, re.IGNORECASE)
+            operator_match = _OPERATOR_NUM_RE.search(comment)
             operator_unit = f"Operator {operator_match.group(1)}" if operator_match else "Operator 1"
 
             # Extract duration if present
@@ -842,10 +871,11 @@ class SequenceDetailExporter:
                 'group_name': None
             })
 
-        # Pattern 5: Cylinder position checks (NEW) - e.g., MM1_Home, MM2_Work
-        elif re.search(r'MM\d+[._]?(Home|Work|stsAt)', permission_value, re.IGNORECASE):
+        # Pattern 6: Cylinder position checks (NEW) - e.g., MM1_Home, MM2_Work
+        # Checked after Robots on purpose: a robot comment wins over an MM tag
+        elif 'mm' in value_lower and _MM_STATUS_RE.search(permission_value):
             # Extract MM number and state
-            match = re.search(r'MM(\d+)[._]?(Home|Work|stsAt(Home|Work))', permission_value, re.IGNORECASE)
+            match = _MM_STATUS_NUM_RE.search(permission_value)
             if match:
                 mm_num = match.group(1)
                 state_raw = match.group(2)
@@ -862,6 +892,7 @@ class SequenceDetailExporter:
                     'custom_desc': None,
                     'custom_duration': None,
                     'status': self._format_state_robust(state),
+                    'standard_duration': 0.0,
                     'group_desc': f"MM{mm_num} Group",
                     'group_name': f"MM{mm_num}"
                 })
@@ -873,11 +904,12 @@ class SequenceDetailExporter:
                     'custom_desc': permission_value,
                     'custom_duration': None,
                     'status': None,
+                    'standard_duration': 0.0,
                     'group_desc': comment,
                     'group_name': None
                 })
 
-        # Pattern 6: Other conditions - show as generic wait condition
+        # Pattern 7: Other conditions - show as generic wait condition
         else:
             wait_conditions.append({
                 'actor_type': None,
@@ -885,6 +917,7 @@ class SequenceDetailExporter:
                 'custom_desc': permission_value,
                 'custom_duration': None,
                 'status': None,
+                'standard_duration': 0.0,
                 'group_desc': comment,
                 'group_name': None
             })
@@ -901,20 +934,33 @@ class SequenceDetailExporter:
         Returns:
             Formatted state string like "TO HOME" or "TO WORK"
         """
-        if not state_value:
-            return "TO HOME"
+        # Only a handful of distinct raw states exist, so results are cached per process
+        formatted = _ACTION_STATE_CACHE.get(state_value)
+        if formatted is None:
+            formatted = _ACTION_STATE_CACHE[state_value] = self._normalize_action_state(state_value)
+        return formatted
+
+    def _normalize_action_state(self, state_value) -> str:
+        """
+        Uncached body of _format_state_robust.
 
+        Args:
+            state_value: Raw state value from data
+
+        Returns:
+            Formatted state string like "TO HOME" or "TO WORK"
+        """
         # Normalize: strip whitespace and convert to uppercase
-        state_normalized = str(state_value).strip().upper()
+        state_normalized = str(state_value).strip().upper() if state_value else ''
+
+        if not state_normalized:
+            # Missing or empty after normalization, default to HOME
+            return "TO HOME"
 
         # If already has "TO", keep as is
         if state_normalized.startswith("TO "):
             return state_normalized
 
-        # If empty after normalization, default to HOME
-        if not state_normalized:
-            return "TO HOME"
-
         # Otherwise, add "TO" prefix
         return f"TO {state_normalized}"
 
@@ -925,6 +971,22 @@ class SequenceDetailExporter:
         Args:
             state_value: Raw state value from data (may be None, empty, or uppercase/lowercase)
 
+        Returns:
+            Formatted state string like "AT HOME" or "AT WORK"
+        """
+        # Cylinder states are almost always "HOME" or an override's "TO ...", so cache per process
+        formatted = _START_STATE_CACHE.get(state_value)
+        if formatted is None:
+            formatted = _START_STATE_CACHE[state_value] = self._normalize_start_condition_state(state_value)
+        return formatted
+
+    def _normalize_start_condition_state(self, state_value) -> str:
+        """
+        Uncached body of _format_start_condition_state.
+
+        Args:
+            state_value: Raw state value from data
+
         Returns:
             Formatted state string like "AT HOME" or "AT WORK"
         """
@@ -1005,6 +1067,54 @@ class SequenceDetailExporter:
         kj_name = self._extract_kj_name(manifold)
         return self._build_valve_diagram_name(kj_name, valve_position)
 
+    def _build_allparts_wait_conditions(self, digital_inputs_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Build the SensorUnits wait conditions an "AllParts" permission expands to.
+
+        Args:
+            digital_inputs_data: Digital inputs data
+
+        Returns:
+            List of wait condition dictionaries, one per part sensor, sorted by part
+        """
+        if not digital_inputs_data or not digital_inputs_data.get('digital_inputs'):
+            return []
+
+        # Sort sensors by part assignment for consistent output
+        sensors_list = []
+        for digital_input in digital_inputs_data['digital_inputs']:
+            part_assignment = digital_input.get('part_assignment', 'N/A')
+
+            # Only include sensors with part assignments and starting with BG
+            if part_assignment == 'N/A':
+                continue
+            tag_name = digital_input['tag_name']
+            if not tag_name.startswith('BG'):
+                continue
+
+            # Keep the fields the rows need so the digital input is read only once
+            sensors_list.append((part_assignment, tag_name, digital_input.get('description', '')))
+
+        # Sort by part assignment using robust part name sorting; many sensors
+        # share a part, so each distinct part name is parsed only once
+        part_sort_keys = {sensor[0]: self._sort_part_name(sensor[0]) for sensor in sensors_list}
+        sensors_list.sort(key=lambda x: part_sort_keys[x[0]])
+
+        return [
+            {
+                'actor_type': 'SensorUnits',
+                'actor_unit': None,
+                'custom_desc': None,
+                'custom_duration': None,
+                'status': 'ON',
+                'standard_duration': 0.0,
+                'group_desc': description or part_assignment,
+                # Format sensor name with = and -
+                'group_name': self._format_actor_group_name(tag_name)
+            }
+            for part_assignment, tag_name, description in sensors_list
+        ]
+
     def _extract_duration(self, text: str) -> str:
         """
         Extract duration/timing value from text.
@@ -1015,10 +1125,8 @@ class SequenceDetailExporter:
         Returns:
             Formatted duration string or empty string
         """
-        import re
-
         # Look for patterns like "500ms", "2s", "1.5s"
-        match = re.search(r'(\d+(?:\.\d+)?)\s*(ms|s|sec|seconds?)', text, re.IGNORECASE)
+        match = _DURATION_RE.search(text)
         if match:
             value = match.group(1)
             unit = match.group(2).lower()
@@ -1042,15 +1150,13 @@ class SequenceDetailExporter:
         Returns:
             Robot unit identifier (e.g., "Robot 1", "Robot 2")
         """
-        import re
-
         # Try to find robot number in permission value
-        match = re.search(r'Rbt[._]?(\d+)', permission_value, re.IGNORECASE)
+        match = _RBT_NUM_RE.search(permission_value)
         if match:
             return f"Robot {match.group(1)}"
 
         # Try to find in comment
-        match = re.search(r'Robot\s*(\d+)', comment, re.IGNORECASE)
+        match = _ROBOT_NUM_RE.search(comment)
         if match:
             return f"Robot {match.group(1)}"
 
@@ -1066,10 +1172,8 @@ class SequenceDetailExporter:
         Returns:
             Sort key tuple (priority, numeric_value, string_value)
         """
-        import re
-
         # Try to extract numeric part
-        match = re.match(r'Part(\d+)([A-Za-z]*)', part_name)
+        match = _PART_SORT_RE.match(part_name)
         if match:
             num = int(match.group(1))
             suffix = match.group(2)
@@ -1097,23 +1201,65 @@ class SequenceDetailExporter:
         # Add '= prefix (single quote + equals) to force Excel to treat as text (not formula)
         return f"'={formatted}"
 
-    def _adjust_column_widths(self, ws):
+    def _append_row(self, row_data: Sequence[Any], fill: PatternFill, font: Font,
+                    alignment: Alignment = None):
         """
-        Auto-adjust column widths based on content.
+        Buffer a styled row and track the widest value seen in each column.
+
+        Empty values (None, '', 0.0) are skipped, matching the old post-write
+        scan; everything else is a str or number, so no exception guard is needed.
 
         Args:
-            ws: Worksheet object
+            row_data: Cell values for the row (list or tuple)
+            fill: Fill applied to every cell in the row
+            font: Font applied to every cell in the row
+            alignment: Optional alignment applied to every cell in the row
+        """
+        max_lengths = self._column_max_lengths
+        for col_idx, value in enumerate(row_data):
+            if value:
+                # Most values are already strings; skip the str() round-trip for them
+                length = len(value) if value.__class__ is str else len(str(value))
+                if length > max_lengths[col_idx]:
+                    max_lengths[col_idx] = length
+
+        self._pending_rows.append((row_data, fill, font, alignment))
+
+    def _intern_style(self, ws, fill: PatternFill, font: Font, alignment: Alignment = None):
         """
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
+        Return the shared style array for a (fill, font, alignment) combination.
 
-            for cell in column:
-                try:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-                except:
-                    pass
+        The style objects are registered with the workbook only once; every
+        later row with the same combination reuses the cached style array
+        instead of re-hashing each style object per cell.
 
+        Args:
+            ws: Write-only worksheet
+            fill: Fill style
+            font: Font style
+            alignment: Optional alignment style
+
+        Returns:
+            StyleArray to pass as style_array when building cells
+        """
+        key = (fill, font, alignment)
+        style = self._style_cache.get(key)
+        if style is None:
+            cell = WriteOnlyCell(ws)
+            cell.fill = fill
+            cell.font = font
+            if alignment is not None:
+                cell.alignment = alignment
+            style = self._style_cache[key] = cell._style
+        return style
+
+    def _adjust_column_widths(self, ws):
+        """
+        Auto-adjust column widths based on the max lengths tracked while rows were buffered.
+
+        Args:
+            ws: Worksheet object
+        """
+        for col_idx, max_length in enumerate(self._column_max_lengths, 1):
             adjusted_width = min(max_length + DEFAULT_COLUMN_PADDING, MAX_COLUMN_WIDTH)
-            ws.column_dimensions[column_letter].width = adjusted_width
+            ws.column_dimensions[get_column_letter(col_idx)].width = adjusted_width
@@ -8,12 +8,26 @@ from ..core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# MM group tag in a routine name (e.g., 'Cm010507_MM4' -> 'MM4')
+_MM_NUMBER_RE = re.compile(r'(MM\d+)')
+
 
 class ActuatorExtractor(BaseExtractor):
     """
     Extracts actuator information from MM routines in the L5X.
     Searches for patterns: MOVE('DESCRIPTION', MM{X}Cyls[INDEX].Stg.Name)
     """
+
+    def __init__(self, debug: bool = False):
+        """
+        Initialize the extractor.
+
+        Args:
+            debug: Enable debug mode for detailed logging
+        """
+        super().__init__(debug)
+        # Compiled MOVE pattern per MM number (the pattern only varies by MM)
+        self._mm_pattern_cache = {}
     
     def get_pattern(self) -> str:
         """
@@ -44,8 +58,7 @@ class ActuatorExtractor(BaseExtractor):
         if program_name:
             program_element = navigator.find_program_by_name(program_name)
             if program_element:
-                routines = program_element.findall(f'.//Routines/Routine[@Name="{routine_name}"]')
-                routine = routines[0] if routines else None
+                routine = program_element.find(f'.//Routines/Routine[@Name="{routine_name}"]')
             else:
                 if self.debug:
                     logger.warning(f"Program not found: {program_name}, searching globally")
@@ -59,7 +72,7 @@ class ActuatorExtractor(BaseExtractor):
             return []
 
         # Extract MM number from routine name
-        mm_match = re.search(r'(MM\d+)', routine_name)
+        mm_match = _MM_NUMBER_RE.search(routine_name)
         if not mm_match:
             if self.debug:
                 logger.warning(f"Could not extract MM number from: {routine_name}")
@@ -67,33 +80,31 @@ class ActuatorExtractor(BaseExtractor):
         
         mm_number = mm_match.group(1)
         
-        # Get pattern with specific MM number
-        pattern = self.get_pattern().replace('{mm_number}', mm_number)
+        # Get pattern with specific MM number, compiled once per MM
+        pattern = self._mm_pattern_cache.get(mm_number)
+        if pattern is None:
+            pattern = self._mm_pattern_cache[mm_number] = re.compile(
+                self.get_pattern().replace('{mm_number}', mm_number)
+            )
         
         actuators = []
         
-        # Search in all rungs of the routine
-        rungs = navigator.get_routine_rungs(routine)
-        
-        for rung in rungs:
-            text_element = rung.find('.//Text')
-            if text_element is not None and text_element.text:
-                text = text_element.text
-                
-                # Find all pattern matches
-                matches = re.finditer(pattern, text)
-                for match in matches:
-                    description = match.group(1)
-                    index = int(match.group(2))
-                    
-                    actuators.append({
-                        'index': index,
-                        'description': description,
-                        'mm_number': mm_number
-                    })
-
-                    if self.debug:
-                        logger.debug(f"    [{index}] {description}")
+        # Search all rungs of the routine in one scan. The "''" separator cannot be
+        # consumed by any part of the MOVE pattern, so no match spans two rungs
+        routine_text = "''".join(navigator.iter_rung_texts(routine))
+
+        for match in pattern.finditer(routine_text):
+            description = match.group(1)
+            index = int(match.group(2))
+
+            actuators.append({
+                'index': index,
+                'description': description,
+                'mm_number': mm_number
+            })
+
+            if self.debug:
+                logger.debug(f"    [{index}] {description}")
         
         # Sort by index
         actuators.sort(key=lambda x: x['index'])
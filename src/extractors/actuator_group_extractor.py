@@ -4,6 +4,7 @@ Extracts tags with DataType='AOI_Actuator' from all programs.
 """
 from typing import List, Dict, Any
 from ..core.base_extractor import BaseExtractor
+from ..core.xml_navigator import XMLNavigator
 from ..core.logger import get_logger
 
 logger = get_logger(__name__)
@@ -51,13 +52,17 @@ class ActuatorGroupExtractor(BaseExtractor):
         if self.debug:
             logger.debug(f"Found {len(programs)} program(s) to search")
 
+        # Loop-invariant lookups hoisted out of the per-tag loop
+        debug = self.debug
+        append_item = actuator_groups.append
+
         for program in programs:
             program_name = program.get('Name', 'Unknown')
 
-            # Find all tags with DataType="AOI_Actuator"
-            tags = program.findall('.//Tags/Tag[@DataType="AOI_Actuator"]')
+            # Find all tags with DataType="AOI_Actuator" (from the shared per-program tag index)
+            tags = XMLNavigator.get_tags_by_data_type(program).get('AOI_Actuator', [])
 
-            if tags and self.debug:
+            if tags and debug:
                 logger.debug(f"Program '{program_name}': {len(tags)} actuator group tag(s)")
 
             for tag in tags:
@@ -75,9 +80,9 @@ class ActuatorGroupExtractor(BaseExtractor):
                     'description': description
                 }
 
-                actuator_groups.append(actuator_group)
+                append_item(actuator_group)
 
-                if self.debug:
+                if debug:
                     logger.debug(f"  [{tag_name}] Description: {description}")
 
         if self.debug:
@@ -4,11 +4,32 @@ Extracts tags with DataType='UDT_DigitalInputHal' from all programs.
 """
 from typing import List, Dict, Any
 from ..core.base_extractor import BaseExtractor
+from ..core.xml_navigator import XMLNavigator
 from ..core.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _child_by_name(parent, tag: str, name: str):
+    """
+    Return the first direct child with the given tag and Name attribute.
+
+    Args:
+        parent: Parent XML element (or None)
+        tag: Child element tag
+        name: Value of the child's Name attribute
+
+    Returns:
+        Matching child element, or None if not found
+    """
+    if parent is None:
+        return None
+    for child in parent:
+        if child.tag == tag and child.get('Name') == name:
+            return child
+    return None
+
+
 class DigitalInputExtractor(BaseExtractor):
     """
     Extracts Digital Input tags of type UDT_DigitalInputHal.
@@ -51,13 +72,17 @@ class DigitalInputExtractor(BaseExtractor):
         if self.debug:
             logger.debug(f"Found {len(programs)} program(s) to search")
         
+        # Loop-invariant lookups hoisted out of the per-tag loop
+        debug = self.debug
+        append_item = digital_inputs.append
+
         for program in programs:
             program_name = program.get('Name', 'Unknown')
             
-            # Find all tags with DataType="UDT_DigitalInputHal"
-            tags = program.findall('.//Tags/Tag[@DataType="UDT_DigitalInputHal"]')
+            # Find all tags with DataType="UDT_DigitalInputHal" (from the shared per-program tag index)
+            tags = XMLNavigator.get_tags_by_data_type(program).get('UDT_DigitalInputHal', [])
 
-            if tags and self.debug:
+            if tags and debug:
                 logger.debug(f"Program '{program_name}': {len(tags)} digital input tag(s)")
             
             for tag in tags:
@@ -80,9 +105,9 @@ class DigitalInputExtractor(BaseExtractor):
                     'part_assignment': 'N/A'  # Default, will be updated by PartSensorExtractor
                 }
                 
-                digital_inputs.append(digital_input)
+                append_item(digital_input)
 
-                if self.debug:
+                if debug:
                     logger.debug(f"  [{tag_name}] Parent: {parent_name}")
 
         if self.debug:
@@ -102,23 +127,18 @@ class DigitalInputExtractor(BaseExtractor):
             Parent name string, or empty string if not found
         """
         try:
-            # Navigate to Data/Structure
-            structure = tag.find('.//Data/Structure')
-            if structure is None:
-                return ''
-            
-            # Find StructureMember with Name="Cfg"
-            cfg_member = structure.find('.//StructureMember[@Name="Cfg"]')
-            if cfg_member is None:
-                return ''
-            
-            # Find StructureMember with Name="ParentName" inside Cfg
-            parent_member = cfg_member.find('.//StructureMember[@Name="ParentName"]')
-            if parent_member is None:
-                return ''
+            # Navigate to Data/Structure (the Decorated Data element holds it)
+            structure = None
+            for data in tag:
+                if data.tag == 'Data':
+                    structure = data.find('Structure')
+                    if structure is not None:
+                        break
             
-            # Find DataValueMember with Name="DATA"
-            data_value = parent_member.find('.//DataValueMember[@Name="DATA"]')
+            # Walk Cfg -> ParentName -> DATA over direct children only
+            cfg_member = _child_by_name(structure, 'StructureMember', 'Cfg')
+            parent_member = _child_by_name(cfg_member, 'StructureMember', 'ParentName')
+            data_value = _child_by_name(parent_member, 'DataValueMember', 'DATA')
             if data_value is None:
                 return ''
             
@@ -3,12 +3,23 @@ Extractor for Part-Sensor relationships.
 Extracts sensor assignments from Part routines (Cm{digits}_Part{X}).
 """
 import re
+from collections import defaultdict
 from typing import List, Dict, Any
 from ..core.base_extractor import BaseExtractor
 from ..core.logger import get_logger
+from ..core.xml_navigator import XMLNavigator
 
 logger = get_logger(__name__)
 
+# Pattern to match Part routines: Cm{digits}_Part{number}
+_PART_ROUTINE_PATTERN = r'Cm\d+_Part(\d+)'
+_PART_ROUTINE_RE = re.compile(_PART_ROUTINE_PATTERN)
+
+# Pattern to match sensor assignments: XIC(SENSOR_NAME.Out.Value) OTE(PartX.inpSensors.Y)
+# (ladder text is ASCII, so \s and \d skip the Unicode category tables)
+_SENSOR_ASSIGNMENT_PATTERN = r'XIC\(([A-Za-z0-9_]+)\.Out\.Value\)\s+OTE\(Part(\d+)\.inpSensors\.(\d+)\)'
+_SENSOR_ASSIGNMENT_RE = re.compile(_SENSOR_ASSIGNMENT_PATTERN, re.ASCII)
+
 
 class PartSensorExtractor(BaseExtractor):
     """
@@ -17,10 +28,10 @@ class PartSensorExtractor(BaseExtractor):
     """
 
     # Pattern to match Part routines: Cm{digits}_Part{number}
-    PART_ROUTINE_PATTERN = r'Cm\d+_Part(\d+)'
+    PART_ROUTINE_PATTERN = _PART_ROUTINE_PATTERN
 
     # Pattern to match sensor assignments: XIC(SENSOR_NAME.Out.Value) OTE(PartX.inpSensors.Y)
-    SENSOR_ASSIGNMENT_PATTERN = r'XIC\(([A-Za-z0-9_]+)\.Out\.Value\)\s+OTE\(Part(\d+)\.inpSensors\.(\d+)\)'
+    SENSOR_ASSIGNMENT_PATTERN = _SENSOR_ASSIGNMENT_PATTERN
 
     def get_pattern(self) -> str:
         """
@@ -42,7 +53,8 @@ class PartSensorExtractor(BaseExtractor):
         Returns:
             Dictionary mapping sensor_name -> list of part names (e.g., {'BG1_BGB1': ['Part1', 'Part2']})
         """
-        sensor_to_parts = {}  # sensor_name -> [part_names]
+        # sensor_name -> {part_name: None}; dict keys de-duplicate in O(1) and keep discovery order
+        sensor_to_parts = defaultdict(dict)
 
         if self.debug:
             logger.debug("[PartSensorExtractor] Searching for Part routines...")
@@ -61,8 +73,9 @@ class PartSensorExtractor(BaseExtractor):
         for routine in routines:
             routine_name = routine.get('Name', '')
 
-            # Check if this is a Part routine
-            match = re.search(self.PART_ROUTINE_PATTERN, routine_name)
+            # Check if this is a Part routine (substring prefilter: most routines
+            # don't contain '_Part' and never reach the regex)
+            match = '_Part' in routine_name and _PART_ROUTINE_RE.search(routine_name)
             if match:
                 part_number = match.group(1)
                 part_name = f"Part{part_number}"
@@ -76,10 +89,9 @@ class PartSensorExtractor(BaseExtractor):
 
                 # Map sensors to parts
                 for sensor_name in sensors:
-                    if sensor_name not in sensor_to_parts:
-                        sensor_to_parts[sensor_name] = []
-                    if part_name not in sensor_to_parts[sensor_name]:
-                        sensor_to_parts[sensor_name].append(part_name)
+                    parts = sensor_to_parts[sensor_name]
+                    if part_name not in parts:
+                        parts[part_name] = None
                         if self.debug:
                             logger.debug(f"  Sensor '{sensor_name}' → {part_name}")
 
@@ -89,7 +101,8 @@ class PartSensorExtractor(BaseExtractor):
         if self.debug:
             logger.debug(f"Total unique sensors mapped: {len(sensor_to_parts)}")
 
-        return sensor_to_parts
+        # Parts stay in discovery order; update_part_assignments() sorts them for display
+        return {sensor: list(parts) for sensor, parts in sensor_to_parts.items()}
 
     def _extract_sensors_from_part_routine(self, routine, part_name: str) -> List[str]:
         """
@@ -105,34 +118,26 @@ class PartSensorExtractor(BaseExtractor):
         """
         sensors = []
 
-        # Get all rungs in the routine (RLL format)
-        rungs = routine.findall('.//Rung')
-
         # Extract part number from part_name (e.g., 'Part1' -> '1')
         part_number = part_name.replace('Part', '')
 
-        for rung in rungs:
-            # Get the Text element containing the ladder logic
-            text_elem = rung.find('.//Text')
-            if text_elem is None or text_elem.text is None:
-                continue
-
-            text_content = text_elem.text
-
-            # Search for the standard sensor assignment pattern
-            # Pattern: XIC(SENSOR_NAME.Out.Value) OTE(PartX.inpSensors.Y)
-            matches = re.finditer(self.SENSOR_ASSIGNMENT_PATTERN, text_content)
-
-            for match in matches:
-                sensor_name = match.group(1)
-                matched_part_num = match.group(2)
-                sensor_index = match.group(3)
-
-                # Verify that the part number matches
-                if f"Part{matched_part_num}" == part_name:
-                    sensors.append(sensor_name)
-                    if self.debug:
-                        logger.debug(f"    Found sensor: {sensor_name} at index {sensor_index}")
+        # Search all rungs of the routine (RLL format) in one scan. The "''"
+        # separator cannot be consumed by the sensor pattern, so no match spans
+        # two rungs
+        routine_text = "''".join(XMLNavigator.iter_rung_texts(routine))
+
+        # Search for the standard sensor assignment pattern
+        # Pattern: XIC(SENSOR_NAME.Out.Value) OTE(PartX.inpSensors.Y)
+        for match in _SENSOR_ASSIGNMENT_RE.finditer(routine_text):
+            sensor_name = match.group(1)
+            matched_part_num = match.group(2)
+            sensor_index = match.group(3)
+
+            # Verify that the part number matches
+            if f"Part{matched_part_num}" == part_name:
+                sensors.append(sensor_name)
+                if self.debug:
+                    logger.debug(f"    Found sensor: {sensor_name} at index {sensor_index}")
 
         return sensors
 
@@ -144,8 +149,12 @@ class PartSensorExtractor(BaseExtractor):
             root: XML tree root
             part_routines_found: List of (routine_name, part_name) tuples
         """
-        # Find all AOI_Part tags
-        aoi_part_tags = root.findall('.//Tag[@DataType="AOI_Part"]')
+        # Find all AOI_Part tags (a program scope reuses the shared per-program
+        # tag index; the full L5X also has controller-scoped tags to count)
+        if root.tag == 'Program':
+            aoi_part_tags = XMLNavigator.get_tags_by_data_type(root).get('AOI_Part', [])
+        else:
+            aoi_part_tags = root.findall('.//Tag[@DataType="AOI_Part"]')
 
         routine_count = len(part_routines_found)
         tag_count = len(aoi_part_tags)
@@ -4,11 +4,23 @@ Specialized extractor for transition permissions from EmStatesAndSequences routi
 import re
 from typing import Dict, List, Any
 from collections import defaultdict
+from operator import itemgetter
 from ..core.base_extractor import BaseExtractor
 from ..core.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Permission assignment: EmTransitionStates[X].AutoStartPerms.Y := Value; //Comment
+# (ASCII classes for \s and \d; the comment group still captures any text)
+_TRANSITION_PERMISSION_PATTERN = r'EmTransitionStates\[(\d+)\]\.AutoStartPerms\.(\d+)\s*:=\s*([^;]+);\s*(?://(.*))?'
+_TRANSITION_PERMISSION_RE = re.compile(_TRANSITION_PERMISSION_PATTERN, re.ASCII)
+
+# Transition names from #region comments (e.g., '#region Transition State 3 - Load')
+_REGION_RE = re.compile(r'#region\s+Transition\s+State\s+(\d+)\s+-\s+(.+)')
+
+# C-level sort key for permission dictionaries
+_PERMISSION_INDEX_KEY = itemgetter('permission_index')
+
 
 class TransitionExtractor(BaseExtractor):
     """
@@ -23,7 +35,7 @@ class TransitionExtractor(BaseExtractor):
         Returns:
             Regex pattern for EmTransitionStates assignments
         """
-        return r'EmTransitionStates\[(\d+)\]\.AutoStartPerms\.(\d+)\s*:=\s*([^;]+);\s*(?://(.*))?'
+        return _TRANSITION_PERMISSION_PATTERN
     
     def find_items(self, root, routine_name: str, program_name: str = None) -> List[Dict[str, Any]]:
         """
@@ -45,8 +57,7 @@ class TransitionExtractor(BaseExtractor):
         if program_name:
             program_element = navigator.find_program_by_name(program_name)
             if program_element:
-                routines = program_element.findall(f'.//Routines/Routine[@Name="{routine_name}"]')
-                routine = routines[0] if routines else None
+                routine = program_element.find(f'.//Routines/Routine[@Name="{routine_name}"]')
             else:
                 logger.warning(f"Program not found: {program_name}, searching globally")
                 routine = navigator.find_routine_by_name(routine_name)
@@ -58,12 +69,6 @@ class TransitionExtractor(BaseExtractor):
                 logger.warning(f"Routine not found: {routine_name}")
             return []
         
-        # Get the regex pattern
-        pattern = self.get_pattern()
-        
-        # Pattern to extract transition names from #region comments
-        region_pattern = r'#region\s+Transition\s+State\s+(\d+)\s+-\s+(.+)'
-        
         # Structure to store transitions
         transitions = defaultdict(list)
         transition_names = {}  # Map transition_index -> descriptive_name
@@ -75,16 +80,20 @@ class TransitionExtractor(BaseExtractor):
             line_text = line.text if line.text else ''
             
             # Check for #region comments to extract transition names
-            region_match = re.search(region_pattern, line_text)
-            if region_match:
-                trans_idx = int(region_match.group(1))
-                trans_name = region_match.group(2).strip()
-                transition_names[trans_idx] = trans_name
-                if self.debug:
-                    logger.debug(f"Found transition name: State {trans_idx} - {trans_name}")
+            # (substring gate: only region lines pay for the regex)
+            if '#region' in line_text:
+                region_match = _REGION_RE.search(line_text)
+                if region_match:
+                    trans_idx = int(region_match.group(1))
+                    trans_name = region_match.group(2).strip()
+                    transition_names[trans_idx] = trans_name
+                    if self.debug:
+                        logger.debug(f"Found transition name: State {trans_idx} - {trans_name}")
             
             # Search for all pattern matches (permissions)
-            matches = re.finditer(pattern, line_text)
+            if 'AutoStartPerms' not in line_text:
+                continue
+            matches = _TRANSITION_PERMISSION_RE.finditer(line_text)
             for match in matches:
                 transition_idx = int(match.group(1))
                 permission_idx = int(match.group(2))
@@ -107,9 +116,10 @@ class TransitionExtractor(BaseExtractor):
         
         # Convert to list format
         result = []
-        for trans_idx in sorted(transitions.keys()):
-            # Sort permissions by index
-            permissions = sorted(transitions[trans_idx], key=lambda x: x['permission_index'])
+        for trans_idx in sorted(transitions):
+            # Sort permissions by index (in place; the lists are built above)
+            permissions = transitions[trans_idx]
+            permissions.sort(key=_PERMISSION_INDEX_KEY)
             
             # Get descriptive name if available
             descriptive_name = transition_names.get(trans_idx, None)
@@ -3,12 +3,26 @@ Extractor for valve mappings from MapIo program.
 Maps MM groups to physical valve manifolds and valve positions.
 """
 import re
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from ..core.base_extractor import BaseExtractor
 from ..core.logger import get_logger
+from ..core.xml_navigator import XMLNavigator
 
 logger = get_logger(__name__)
 
+# Pattern to find MM routines
+_MM_ROUTINE_PATTERN = r'Cm\d+_MM(\d+)'
+_MM_ROUTINE_RE = re.compile(_MM_ROUTINE_PATTERN)
+
+# Pattern to find MM commands in ladder logic
+# Example: ,XIC(MM1.outWork) OTE(MM1_ToWork.Inp.Value
+_COMMAND_PATTERN = r',XIC\(MM(\d+)\.(out(?:Work|Home))\)\s+OTE\(([A-Za-z0-9_]+)'
+_COMMAND_RE = re.compile(_COMMAND_PATTERN)
+
+# Pattern to find AOI_ValveManifold calls (supports V4, V8, V12, V16, etc.)
+_AOI_PATTERN = r'AOI_ValveManifold_V\d+\(([^)]+)\)'
+_AOI_RE = re.compile(_AOI_PATTERN)
+
 
 class ValveMappingExtractor(BaseExtractor):
     """
@@ -25,14 +39,14 @@ class ValveMappingExtractor(BaseExtractor):
     """
 
     # Pattern to find MM routines
-    MM_ROUTINE_PATTERN = r'Cm\d+_MM(\d+)'
+    MM_ROUTINE_PATTERN = _MM_ROUTINE_PATTERN
 
     # Pattern to find MM commands in ladder logic
     # Example: ,XIC(MM1.outWork) OTE(MM1_ToWork.Inp.Value
-    COMMAND_PATTERN = r',XIC\(MM(\d+)\.(out(?:Work|Home))\)\s+OTE\(([A-Za-z0-9_]+)'
+    COMMAND_PATTERN = _COMMAND_PATTERN
 
     # Pattern to find AOI_ValveManifold calls (supports V4, V8, V12, V16, etc.)
-    AOI_PATTERN = r'AOI_ValveManifold_V\d+\(([^)]+)\)'
+    AOI_PATTERN = _AOI_PATTERN
 
     def get_pattern(self) -> str:
         """
@@ -86,14 +100,8 @@ class ValveMappingExtractor(BaseExtractor):
         """
         mm_commands = {}
 
-        # Find the fixture program
-        programs = root.findall('.//Programs/Program')
-        fixture_program = None
-
-        for prog in programs:
-            if prog.get('Name') == program_name:
-                fixture_program = prog
-                break
+        # Find the fixture program (first match, filtered by the path predicate)
+        fixture_program = root.find(f'.//Programs/Program[@Name="{program_name}"]')
 
         if not fixture_program:
             if self.debug:
@@ -105,7 +113,7 @@ class ValveMappingExtractor(BaseExtractor):
 
         for routine in routines:
             routine_name = routine.get('Name', '')
-            match = re.search(self.MM_ROUTINE_PATTERN, routine_name)
+            match = _MM_ROUTINE_RE.search(routine_name)
 
             if match:
                 mm_number = match.group(1)
@@ -115,27 +123,25 @@ class ValveMappingExtractor(BaseExtractor):
                 if mm_key not in mm_commands:
                     mm_commands[mm_key] = {'work_cmd': None, 'home_cmd': None}
 
-                # Search for command patterns in rungs
-                rungs = routine.findall('.//Rung')
-
-                for rung in rungs:
-                    text_elem = rung.find('.//Text')
-                    if text_elem is not None and text_elem.text:
-                        text = text_elem.text
+                # Search for command patterns in rungs (streamed, no rung list)
+                for text in XMLNavigator.iter_rung_texts(routine):
+                    # Literal prefilter: most rungs carry no MM command
+                    if ',XIC(MM' not in text:
+                        continue
 
-                        # Find all command patterns
-                        cmd_matches = re.finditer(self.COMMAND_PATTERN, text)
+                    # Find all command patterns
+                    cmd_matches = _COMMAND_RE.finditer(text)
 
-                        for cmd_match in cmd_matches:
-                            cmd_mm_num = cmd_match.group(1)
-                            cmd_type = cmd_match.group(2)  # outWork or outHome
-                            cmd_name = cmd_match.group(3)  # MM1_ToWork
+                    for cmd_match in cmd_matches:
+                        cmd_mm_num = cmd_match.group(1)
+                        cmd_type = cmd_match.group(2)  # outWork or outHome
+                        cmd_name = cmd_match.group(3)  # MM1_ToWork
 
-                            if cmd_mm_num == mm_number:
-                                if cmd_type == 'outWork':
-                                    mm_commands[mm_key]['work_cmd'] = cmd_name
-                                elif cmd_type == 'outHome':
-                                    mm_commands[mm_key]['home_cmd'] = cmd_name
+                        if cmd_mm_num == mm_number:
+                            if cmd_type == 'outWork':
+                                mm_commands[mm_key]['work_cmd'] = cmd_name
+                            elif cmd_type == 'outHome':
+                                mm_commands[mm_key]['home_cmd'] = cmd_name
 
                 if self.debug:
                     logger.debug(f"Found {mm_key}: Work={mm_commands[mm_key]['work_cmd']}, Home={mm_commands[mm_key]['home_cmd']}")
@@ -159,63 +165,68 @@ class ValveMappingExtractor(BaseExtractor):
         valve_mappings = []
 
         # Find MapIo program
-        programs = root.findall('.//Programs/Program')
-        mapio_program = None
-
-        for prog in programs:
-            if prog.get('Name') == 'MapIo':
-                mapio_program = prog
-                break
+        mapio_program = root.find('.//Programs/Program[@Name="MapIo"]')
 
         if not mapio_program:
             if self.debug:
                 logger.debug("MapIo program not found, no valve mappings available")
             return valve_mappings
 
+        # Command names per MM, flattened once for every AOI call below. Kept in
+        # mm_commands order (the first MM whose command matches wins); MMs with
+        # neither command can never match and are left out
+        command_names = [
+            (mm_key, commands['work_cmd'], commands['home_cmd'])
+            for mm_key, commands in mm_commands.items()
+            if commands['work_cmd'] or commands['home_cmd']
+        ]
+
         # Search all routines in MapIo for AOI_ValveManifold_V8
         routines = mapio_program.findall('.//Routines/Routine')
 
         for routine in routines:
-            rungs = routine.findall('.//Rung')
+            # Stream rung texts instead of materializing the rung list
+            for text in XMLNavigator.iter_rung_texts(routine):
+                # Check if this rung contains our fixture's commands. A backslash-escaped
+                # reference (e.g., \_010UA1_Fixture_Em0105) contains the plain name too,
+                # so one substring test covers both forms
+                if program_name not in text:
+                    continue
 
-            for rung in rungs:
-                text_elem = rung.find('.//Text')
-                if text_elem is not None and text_elem.text:
-                    text = text_elem.text
+                # Literal prefilter before running the AOI regex
+                if 'AOI_ValveManifold_V' not in text:
+                    continue
 
-                    # Check if this rung contains our fixture's commands
-                    # Handle backslash escapes in ladder logic text (e.g., \_010UA1_Fixture_Em0105)
-                    if program_name not in text and f"\\{program_name}" not in text:
-                        continue
-
-                    # Find AOI_ValveManifold_V8 calls
-                    aoi_matches = re.finditer(self.AOI_PATTERN, text)
+                # Find AOI_ValveManifold_V8 calls
+                aoi_matches = _AOI_RE.finditer(text)
 
-                    for aoi_match in aoi_matches:
-                        params_str = aoi_match.group(1)
+                for aoi_match in aoi_matches:
+                    params_str = aoi_match.group(1)
 
-                        # Parse AOI parameters
-                        mappings = self._parse_aoi_valvemanifold(params_str, program_name, mm_commands)
-                        valve_mappings.extend(mappings)
+                    # Parse AOI parameters
+                    mappings = self._parse_aoi_valvemanifold(params_str, program_name, command_names)
+                    valve_mappings.extend(mappings)
 
         return valve_mappings
 
-    def _parse_aoi_valvemanifold(self, params_str: str, program_name: str, mm_commands: Dict) -> List[Dict[str, Any]]:
+    def _parse_aoi_valvemanifold(self, params_str: str, program_name: str,
+                                 command_names: List[Tuple[str, Optional[str], Optional[str]]]) -> List[Dict[str, Any]]:
         """
         Parse AOI_ValveManifold_V8 parameters and extract valve mappings.
 
         Args:
             params_str: Parameter string from AOI call
             program_name: Fixture program name
-            mm_commands: MM commands dict
+            command_names: Ordered (mm_key, work_cmd, home_cmd) tuples; the first MM
+                whose command matches a valve wins
 
         Returns:
             List of valve mappings for this AOI call
         """
         mappings = []
 
-        # Split parameters by comma
-        params = [p.strip() for p in params_str.split(',')]
+        # Split parameters by comma (each one is stripped where it is read)
+        params = params_str.split(',')
 
         if len(params) < 7:
             if self.debug:
@@ -223,7 +234,7 @@ class ValveMappingExtractor(BaseExtractor):
             return mappings
 
         # Extract manifold name (parameter 3, index 2)
-        manifold_name = params[2]
+        manifold_name = params[2].strip()
 
         if self.debug:
             logger.debug(f"Processing AOI with manifold: {manifold_name}")
@@ -231,8 +242,8 @@ class ValveMappingExtractor(BaseExtractor):
         # Parameters 6+ (index 5+) contain valve assignments
         # Each pair represents one valve: (Work, Home)
         for i in range(5, len(params), 2):
-            work_param = params[i] if i < len(params) else None
-            home_param = params[i + 1] if i + 1 < len(params) else None
+            work_param = params[i].strip() if i < len(params) else None
+            home_param = params[i + 1].strip() if i + 1 < len(params) else None
 
             if not work_param or not home_param:
                 break
@@ -245,10 +256,7 @@ class ValveMappingExtractor(BaseExtractor):
             valve_index = ((i - 5) // 2) + 1
 
             # Find which MM this valve belongs to by matching command names
-            for mm_key, commands in mm_commands.items():
-                work_cmd = commands.get('work_cmd')
-                home_cmd = commands.get('home_cmd')
-
+            for mm_key, work_cmd, home_cmd in command_names:
                 # Check if work command matches
                 work_match = work_cmd and work_cmd in work_param
                 home_match = home_cmd and home_cmd in home_param
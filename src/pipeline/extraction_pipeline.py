@@ -73,6 +73,8 @@ class ExtractionPipeline:
         self.actuator_group_extractor = ActuatorGroupExtractor(debug=debug)
         self.valve_mapping_extractor = ValveMappingExtractor(debug=debug)
         self.validator = ArrayValidator(debug=debug)
+        # Actuators per (mm_number, program_name); every action on an MM reuses one scan
+        self._actuators_cache = {}
         self.excel_exporter = ExcelExporter()
         self.sequence_detail_exporter = SequenceDetailExporter()
 
@@ -432,8 +434,7 @@ class ExtractionPipeline:
             # Find routine within the specific program
             program_element = self.navigator.find_program_by_name(program_name)
             if program_element:
-                routines = program_element.findall(f'.//Routines/Routine[@Name="{routine_name}"]')
-                routine = routines[0] if routines else None
+                routine = program_element.find(f'.//Routines/Routine[@Name="{routine_name}"]')
             else:
                 logger.warning(f"Program not found: {program_name}, searching globally")
                 routine = self.navigator.find_routine_by_name(routine_name)
@@ -494,11 +495,7 @@ class ExtractionPipeline:
                         logger.debug(f"  Searching for actuators...")
                     
                     # Extract actuators
-                    actuators = self.actuator_extractor.find_actuators_for_mm(
-                        self.navigator.get_root(),
-                        mm_number,
-                        program_name=program_name
-                    )
+                    actuators = self._find_actuators_for_mm(mm_number, program_name)
 
                     # Validate actuators
                     validation = self.validator.validate_actuators(
@@ -712,6 +709,31 @@ class ExtractionPipeline:
                     import traceback
                     logger.debug(traceback.format_exc())
 
+    def _find_actuators_for_mm(self, mm_number: str, program_name: str = None) -> List[Dict[str, Any]]:
+        """
+        Find the actuators of an MM group, scanning its routine only once.
+
+        Sequence actions reference the same MM groups many times and the
+        Sequence Detail export asks for every group again, so results are
+        cached per (mm_number, program_name). Callers must not mutate them.
+
+        Args:
+            mm_number: MM number (e.g., 'MM4')
+            program_name: Optional program name for scoping (multi-fixture support)
+
+        Returns:
+            List of found actuators
+        """
+        key = (mm_number, program_name)
+        actuators = self._actuators_cache.get(key)
+        if actuators is None:
+            actuators = self._actuators_cache[key] = self.actuator_extractor.find_actuators_for_mm(
+                self.navigator.get_root(),
+                mm_number,
+                program_name=program_name
+            )
+        return actuators
+
     def _extract_all_actuators(self, program_name: str) -> Dict[str, Any]:
         """
         Extract ALL actuators from all MM routines in a fixture program.
@@ -731,11 +753,7 @@ class ExtractionPipeline:
             mm_number = f'MM{mm_num}'
 
             # Try to extract actuators for this MM
-            actuators = self.actuator_extractor.find_actuators_for_mm(
-                self.navigator.get_root(),
-                mm_number,
-                program_name=program_name
-            )
+            actuators = self._find_actuators_for_mm(mm_number, program_name)
 
             # Only include if actuators were found
             if actuators:
@@ -0,0 +1,29 @@
+"""
+Each export must write its output file exactly once, after all sheets are built.
+"""
+from unittest import mock
+
+from src.exporters.excel_exporter import ExcelExporter
+from src.exporters.sequence_detail_exporter import SequenceDetailExporter
+
+SEQUENCES_DATA = {'routine_name': 'R2S', 'sequences': []}
+
+
+def test_excel_exporter_saves_once_per_export(tmp_path):
+    exporter = ExcelExporter()
+    with mock.patch.object(ExcelExporter, '_save_workbook', autospec=True) as save:
+        exporter.export(SEQUENCES_DATA, {}, {}, {}, {}, str(tmp_path / 'a.xlsx'))
+        assert save.call_count == 1
+
+        exporter.export(SEQUENCES_DATA, {}, {}, {}, {}, str(tmp_path / 'b.xlsx'))
+        assert save.call_count == 2
+
+
+def test_sequence_detail_exporter_saves_once_per_export(tmp_path):
+    exporter = SequenceDetailExporter()
+    with mock.patch.object(SequenceDetailExporter, '_save_with_openpyxl', autospec=True) as save:
+        exporter.export({}, {}, {}, {}, {}, {}, {}, str(tmp_path / 'a.xlsx'))
+        assert save.call_count == 1
+
+        exporter.export({}, {}, {}, {}, {}, {}, {}, str(tmp_path / 'b.xlsx'))
+        assert save.call_count == 2